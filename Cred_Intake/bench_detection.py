@@ -0,0 +1,105 @@
+#!/usr/bin/env python3
+"""
+Micro-benchmark for master6.py header and category detection.
+
+Builds synthetic sheet rows (value tuples, as iter_rows(values_only=True) yields them),
+runs the original is_header_row/detect_category and the precompiled ones over the same
+hot loop, checks they agree on every row, and prints the timings for each.
+
+Usage:
+    python bench_detection.py [--rows 200000] [--repeat 3]
+"""
+import argparse
+import random
+import time
+
+import pandas as pd
+
+from master6 import COMMON_COLUMNS, IPA_COLUMNS, detect_category, is_header_row
+
+
+def is_header_row_original(values):
+    texts = [str(v).strip().lower() for v in values if v]
+    return 'status' in texts and any(col.lower() in texts for col in IPA_COLUMNS)
+
+
+def detect_category_original(status_val):
+    if pd.notna(status_val):
+        val = str(status_val).strip().lower()
+        if 'reinstatemen' in val:
+            return 'Reinstatements'
+        if 'initial' in val:
+            return 'Initial'
+        if 'recred' in val:
+            return 'Recreds'
+        if 'hdo' in val:
+            return 'HDOs'
+        if 'link' in val:
+            return 'Links'
+    return None
+
+
+def generate_rows(n_rows: int, seed: int = 0):
+    """Header rows every ~500 rows, data rows with a STATUS value in between."""
+    rng = random.Random(seed)
+    header = tuple(IPA_COLUMNS + [aliases[0] for aliases in COMMON_COLUMNS])
+    status_idx = header.index('STATUS')
+    statuses = ['INITIAL', 'RECRED', 'HDO-INITIAL', 'HDO-RECRED', 'REINSTATEMENT',
+                'LINK-RECRED', 'LINK-INITIAL', 'Pending', None, 12345]
+    rows = []
+    for i in range(n_rows):
+        if i % 500 == 0:
+            rows.append(header)
+            continue
+        row = [rng.choice(['x', None]) for _ in IPA_COLUMNS]
+        row += [f"value {i}" for _ in COMMON_COLUMNS]
+        row[status_idx] = rng.choice(statuses)
+        rows.append(tuple(row))
+    return rows, status_idx
+
+
+def run(rows, status_idx, header_fn, category_fn):
+    out = []
+    for values in rows:
+        if header_fn(values):
+            out.append('header')
+        else:
+            out.append(category_fn(values[status_idx]))
+    return out
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark master6 header/category detection.')
+    parser.add_argument('--rows', type=int, default=200_000, help='Number of synthetic rows')
+    parser.add_argument('--repeat', type=int, default=3, help='Timing repetitions (best is reported)')
+    args = parser.parse_args()
+
+    rows, status_idx = generate_rows(args.rows)
+
+    expected = run(rows, status_idx, is_header_row_original, detect_category_original)
+    actual = run(rows, status_idx, is_header_row, detect_category)
+    assert actual == expected, 'precompiled matcher disagrees with the original'
+    print(f"{args.rows:,} rows: results identical")
+
+    statuses = [values[status_idx] for values in rows]
+    loops = {
+        'header': (lambda fn: [fn(values) for values in rows],
+                   is_header_row_original, is_header_row),
+        'category': (lambda fn: [fn(value) for value in statuses],
+                     detect_category_original, detect_category),
+    }
+    for name, (loop, original, precompiled) in loops.items():
+        timings = {}
+        for label, fn in (('original', original), ('precompiled', precompiled)):
+            best = float('inf')
+            for _ in range(args.repeat):
+                start = time.perf_counter()
+                loop(fn)
+                best = min(best, time.perf_counter() - start)
+            timings[label] = best
+        print(f"{name:9s} original {timings['original']:7.3f}s  precompiled {timings['precompiled']:7.3f}s  "
+              f"speedup {timings['original'] / timings['precompiled']:5.1f}x")
+
+
+if __name__ == '__main__':
+    main()
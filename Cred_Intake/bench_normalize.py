@@ -0,0 +1,104 @@
+#!/usr/bin/env python3
+"""
+Benchmark and equivalence check for organize.normalize_sheet.
+
+Generates a synthetic credentialing workbook, reads it back the same way organize.py does,
+and runs both the original row-by-row normalizer and the vectorized one on it.
+The outputs must be identical; the script prints both timings and the speedup.
+
+Usage:
+    python bench_normalize.py [--rows 100000] [--keep path/to/workbook.xlsx]
+"""
+import argparse
+import random
+import tempfile
+import time
+from pathlib import Path
+
+import pandas as pd
+
+from organize import network_map, output_columns, normalize_sheet
+
+
+def normalize_sheet_rowwise(df: pd.DataFrame) -> pd.DataFrame:
+    """The original iterrows implementation, kept as the reference."""
+    rows = []
+    for _, row in df.iterrows():
+        new_row = {col: '' for col in output_columns}
+
+        new_row['COMMITTEE (Astrana Health)'] = row.get('COMMITTEE (Astrana Health)', '')
+        new_row['LEVEL       (1 or 2)'] = row.get('LEVEL       (1 or 2)', '')
+        new_row['LAST'] = row.get('LAST/HDO Name', '')
+        new_row['FIRST'] = row.get('FIRST', '')
+        new_row['DEGREE'] = row.get('DEGREE', '')
+        new_row['TYPE'] = row.get('TYPE (PCP/SCP/AHP/HDO)', '')
+        new_row['SPECIALTY'] = row.get('SPECIALTY', '')
+        new_row['NPI'] = row.get('NPI', '')
+        new_row['Vendor'] = row.get('Vendor', '')
+        new_row['COUNTY'] = row.get('COUNTY', '')
+        new_row['COMMITTEE SUBMISSION DATE'] = row.get('COMMITTEE SUBMISSION DATE', '')
+        new_row['STATUS'] = row.get('STATUS', '')
+
+        for full_name, code in network_map.items():
+            val = str(row.get(full_name, '')).strip().lower()
+            if val == 'x':
+                new_row[code] = 'x'
+
+        rows.append(new_row)
+
+    return pd.DataFrame(rows, columns=output_columns)
+
+
+def generate_workbook(path: Path, n_rows: int, seed: int = 0) -> None:
+    """Write a one-sheet workbook shaped like the master6.py output."""
+    rng = random.Random(seed)
+    marks = ['x', 'X', ' x ', '', None, 'n/a']
+    statuses = ['INITIAL', 'RECRED', 'HDO-RECRED', 'REINSTATEMENT', 'LINK-INITIAL']
+    data = {name: [rng.choice(marks) for _ in range(n_rows)] for name in network_map}
+    data.update({
+        'COMMITTEE (Astrana Health)': [rng.choice(['Astrana', None]) for _ in range(n_rows)],
+        'LEVEL       (1 or 2)': [rng.choice([1, 2]) for _ in range(n_rows)],
+        'LAST/HDO Name': [f"Last{i}" for i in range(n_rows)],
+        'FIRST': [f"First{i}" for i in range(n_rows)],
+        'DEGREE': [rng.choice(['MD', 'DO', 'NP', 'PA', None]) for _ in range(n_rows)],
+        'TYPE (PCP/SCP/AHP/HDO)': [rng.choice(['PCP', 'SCP', 'AHP', 'HDO']) for _ in range(n_rows)],
+        'SPECIALTY': [rng.choice(['Family Medicine', 'Cardiology', None]) for _ in range(n_rows)],
+        'NPI': [rng.randrange(10**9, 10**10) for _ in range(n_rows)],
+        'LICENSE': [f"A{rng.randrange(10**5, 10**6)}" for _ in range(n_rows)],
+        # Vendor intentionally left out to cover missing source columns
+        'COUNTY': [rng.choice(['Los Angeles', 'Orange', None]) for _ in range(n_rows)],
+        'COMMITTEE SUBMISSION DATE': [f"2025-{rng.randrange(1, 13):02d}-01" for _ in range(n_rows)],
+        'STATUS': [rng.choice(statuses) for _ in range(n_rows)],
+    })
+    pd.DataFrame(data).to_excel(path, index=False)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark the vectorized normalize_sheet against the row-wise original.')
+    parser.add_argument('--rows', type=int, default=100_000, help='Number of rows in the generated workbook')
+    parser.add_argument('--keep', help='Write the generated workbook here instead of a temp directory')
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = Path(args.keep) if args.keep else Path(tmp) / 'bench_input.xlsx'
+        print(f"Generating {args.rows:,} rows -> {path}")
+        generate_workbook(path, args.rows)
+        df = pd.read_excel(path)
+
+    start = time.perf_counter()
+    expected = normalize_sheet_rowwise(df)
+    rowwise = time.perf_counter() - start
+
+    start = time.perf_counter()
+    actual = normalize_sheet(df)
+    vectorized = time.perf_counter() - start
+
+    pd.testing.assert_frame_equal(actual, expected)
+    print("Outputs identical")
+    print(f"row-wise:   {rowwise:8.3f}s")
+    print(f"vectorized: {vectorized:8.3f}s")
+    print(f"speedup:    {rowwise / vectorized:8.1f}x")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,139 @@
+#!/usr/bin/env python3
+"""
+Columnar history of credentialing runs, shared by master6.py and organize.py.
+
+Every run appends Parquet files laid out as
+
+    <store>/<dataset>/run_date=YYYY-MM-DD/category=<Category>/<run id>.parquet
+
+master6.py writes the 'intake' dataset and organize.py writes the 'master' dataset.
+All values are stored as text so every run of a dataset shares one schema.
+load_history() reads back only the partitions and columns a query needs, e.g.
+
+    from history_store import load_history
+    df = load_history('Results/history', categories=['Initial', 'Recreds'], since='2025-07-01',
+                      columns=['NPI', 'LAST/HDO Name', 'STATUS'])
+
+Needs pyarrow (pip install pyarrow).
+"""
+import argparse
+import importlib.util
+import uuid
+from datetime import date, datetime
+from pathlib import Path
+
+import pandas as pd
+
+# Columns added to every stored row
+RUN_COLUMNS = ['run_at', 'Input File']
+# Hive partition keys, in directory order
+PARTITION_COLUMNS = ['run_date', 'category']
+
+
+def history_available() -> bool:
+    """True when pyarrow is installed, so the store can be written and read."""
+    return importlib.util.find_spec('pyarrow') is not None
+
+
+def _day(value) -> str:
+    """Normalize a date, datetime or 'YYYY-MM-DD' string to the partition format."""
+    if isinstance(value, datetime):
+        return value.date().isoformat()
+    if isinstance(value, date):
+        return value.isoformat()
+    return pd.Timestamp(value).date().isoformat()
+
+
+def _schema(columns):
+    import pyarrow as pa
+    return pa.schema([(col, pa.string()) for col in list(columns) + RUN_COLUMNS])
+
+
+def append_history(store_dir, dataset: str, df: pd.DataFrame, columns: list,
+                   run_at: datetime = None, category_column: str = 'category') -> int:
+    """
+    Append the rows of df to the store, one Parquet file per category.
+    df must carry the category in category_column; columns fixes the stored column order
+    (missing ones are stored as nulls). Returns the number of rows written.
+    """
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    if df.empty:
+        return 0
+    run_at = run_at or datetime.now()
+    schema = _schema(columns)
+    run_id = f"{run_at.strftime('%H%M%S')}-{uuid.uuid4().hex[:8]}"
+    written = 0
+
+    for category, part in df.groupby(category_column, sort=False):
+        out = part.reindex(columns=list(columns) + ['Input File'])
+        out.insert(len(columns), 'run_at', run_at.strftime('%Y-%m-%d %H:%M:%S'))
+        out = out.astype('string')
+        part_dir = Path(store_dir) / dataset / f"run_date={_day(run_at)}" / f"category={category}"
+        part_dir.mkdir(parents=True, exist_ok=True)
+        table = pa.Table.from_pandas(out, schema=schema, preserve_index=False)
+        pq.write_table(table, part_dir / f"{run_id}.parquet")
+        written += len(out)
+    return written
+
+
+def load_history(store_dir, dataset: str = 'intake', categories: list = None,
+                 since=None, until=None, columns: list = None) -> pd.DataFrame:
+    """
+    Load stored rows as a DataFrame with run_date and category columns.
+    categories, since and until (inclusive run dates) prune whole partitions;
+    columns limits which stored columns are read.
+    """
+    import pyarrow as pa
+    import pyarrow.dataset as ds
+
+    root = Path(store_dir) / dataset
+    if not root.exists():
+        return pd.DataFrame(columns=(columns or []) + PARTITION_COLUMNS)
+
+    partitioning = ds.partitioning(
+        pa.schema([(col, pa.string()) for col in PARTITION_COLUMNS]), flavor='hive'
+    )
+    dataset_ = ds.dataset(root, format='parquet', partitioning=partitioning)
+
+    expr = None
+    conditions = []
+    if categories:
+        conditions.append(ds.field('category').isin(list(categories)))
+    if since is not None:
+        conditions.append(ds.field('run_date') >= _day(since))
+    if until is not None:
+        conditions.append(ds.field('run_date') <= _day(until))
+    for condition in conditions:
+        expr = condition if expr is None else expr & condition
+
+    wanted = None if columns is None else list(columns) + PARTITION_COLUMNS
+    table = dataset_.to_table(columns=wanted, filter=expr)
+    return table.to_pandas()
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Query the credentialing history store.')
+    parser.add_argument('store_dir', help='History directory (e.g. Results/history)')
+    parser.add_argument('--dataset', default='intake', help="'intake' (master6.py) or 'master' (organize.py)")
+    parser.add_argument('--category', action='append', help='Category to include; repeat for several')
+    parser.add_argument('--since', help='First run date to include (YYYY-MM-DD)')
+    parser.add_argument('--until', help='Last run date to include (YYYY-MM-DD)')
+    parser.add_argument('--column', action='append', help='Column to load; repeat for several')
+    parser.add_argument('-o', '--output_file', help='Write the result to this .csv or .xlsx file')
+    args = parser.parse_args()
+
+    df = load_history(args.store_dir, args.dataset, args.category, args.since, args.until, args.column)
+    if args.output_file:
+        if args.output_file.lower().endswith('.csv'):
+            df.to_csv(args.output_file, index=False)
+        else:
+            df.to_excel(args.output_file, index=False)
+        print(f"{len(df)} rows written to {args.output_file}")
+    else:
+        print(df.to_string(max_rows=50))
+
+
+if __name__ == '__main__':
+    main()
@@ -11,10 +11,28 @@ Usage:
 import argparse
 from pathlib import Path
 import pandas as pd
-from openpyxl import load_workbook
+from openpyxl import Workbook, load_workbook
+from openpyxl.cell import WriteOnlyCell
+from openpyxl.xml.functions import fromstring, tostring
+from openpyxl.styles import Alignment, Border, Font, NamedStyle, Side
+from openpyxl.styles.borders import DEFAULT_BORDER
+from openpyxl.styles.fills import DEFAULT_EMPTY_FILL, Fill
+from openpyxl.styles.fonts import DEFAULT_FONT
 from copy import copy
 import getpass
-from datetime import datetime
+import hashlib
+import inspect
+import json
+import re
+import sqlite3
+import time
+from concurrent.futures import ProcessPoolExecutor
+from datetime import date, datetime, time as dt_time, timedelta
+from functools import lru_cache
+from itertools import repeat
+
+from history_store import append_history, history_available
+from processing_log import LOG_FILE, append_log
 
 # Define the lists of IPA organization columns (styled columns)
 IPA_COLUMNS = [
@@ -69,6 +87,20 @@ target_headers = {
     'Reinstatements': [[col] for col in IPA_COLUMNS] + COMMON_COLUMNS,
 }
 
+# Named style applied to the header row of every category sheet
+HEADER_STYLE = 'Master Header'
+
+# Date formats pandas' to_excel used for the master file before the write-only writer
+DATETIME_FORMAT = 'YYYY-MM-DD HH:MM:SS'
+DATE_FORMAT = 'YYYY-MM-DD'
+
+# (fill, font, border) of an unstyled cell; such IPA cells are written without a named style
+DEFAULT_STYLE = (DEFAULT_EMPTY_FILL, DEFAULT_FONT, DEFAULT_BORDER)
+
+# Parse cache kept in the output directory. Entries are tied to cache_version(), a hash of
+# the header/alias/category tables and the parser code, so editing either re-parses everything.
+CACHE_FILE = 'intake_cache.sqlite'
+
 # Build a mapping from lowercase alias to canonical header
 alias_map = {}
 for cat, alias_lists in target_headers.items():
@@ -78,130 +110,401 @@ for cat, alias_lists in target_headers.items():
             alias_map[alias.strip().lower()] = canonical
 
 
+# Precompiled matchers, built once at import time
+IPA_HEADER_KEYS = frozenset(col.lower() for col in IPA_COLUMNS)
+STATUS_HEADER_KEY = 'status'
+
+# STATUS substrings in priority order: the first one present decides the category
+CATEGORY_TOKENS = [
+    ('reinstatemen', 'Reinstatements'),
+    ('initial', 'Initial'),
+    ('recred', 'Recreds'),
+    ('hdo', 'HDOs'),
+    ('link', 'Links'),
+]
+CATEGORY_PRIORITY = {token: rank for rank, (token, _) in enumerate(CATEGORY_TOKENS)}
+CATEGORY_BY_TOKEN = dict(CATEGORY_TOKENS)
+CATEGORY_PATTERN = re.compile('|'.join(re.escape(token) for token, _ in CATEGORY_TOKENS))
+
+
+@lru_cache(maxsize=1024)
+def _classify_status(text: str):
+    """Map STATUS text to a category in one regex scan; memoized per distinct value."""
+    found = CATEGORY_PATTERN.findall(text.lower())
+    if not found:
+        return None
+    return CATEGORY_BY_TOKEN[min(found, key=CATEGORY_PRIORITY.__getitem__)]
+
+
 def detect_category(status_val):
     """
     Determine category based on STATUS value.
     """
-    if pd.notna(status_val):
-        val = str(status_val).strip().lower()
-        if 'reinstatemen' in val:
-            return 'Reinstatements'
-        if 'initial' in val:
-            return 'Initial'
-        if 'recred' in val:
-            return 'Recreds'
-        if 'hdo' in val:
-            return 'HDOs'
-        if 'link' in val:
-            return 'Links'
+    if isinstance(status_val, str):
+        return _classify_status(status_val)
+    if status_val is not None and pd.notna(status_val):
+        return _classify_status(str(status_val))
     return None
 
 
-def is_header_row(row):
-    texts = [str(cell.value).strip().lower() for cell in row if cell.value]
-    return 'status' in texts and any(col.lower() in texts for col in IPA_COLUMNS)
+def is_header_row(values):
+    # Only text cells can match a header name. Lowercase them in one call and reject
+    # rows without 'status' anywhere before splitting back into cells.
+    # (NUL cannot appear in xlsx cell text, so it is a safe separator.)
+    joined = '\x00'.join(v for v in values if isinstance(v, str)).lower()
+    if STATUS_HEADER_KEY not in joined:
+        return False
+    texts = [text.strip() for text in joined.split('\x00')]
+    return STATUS_HEADER_KEY in texts and not IPA_HEADER_KEYS.isdisjoint(texts)
+
+
+def iter_master_rows(ws):
+    """
+    Stream a worksheet once, detecting header blocks as they go by.
+    Yields (category, row_number, row_data, header_map) for each categorized data row.
+    A blank row closes the current block; the next header row opens a new one.
+    """
+    header_map = None
+    status_idx = None
+    for row_number, values in enumerate(ws.iter_rows(values_only=True), start=1):
+        # Blank rows end the current table
+        if all(v is None for v in values):
+            header_map = None
+            continue
+        if header_map is None:
+            # Detect header
+            if is_header_row(values):
+                header_map = {}
+                for idx, value in enumerate(values, start=1):
+                    if value and isinstance(value, str):
+                        key = value.strip().lower()
+                        if key in alias_map:
+                            header_map[alias_map[key]] = idx
+                status_idx = header_map.get('STATUS')
+            continue
+        status_val = values[status_idx-1] if status_idx and status_idx <= len(values) else None
+        category = detect_category(status_val)
+        if category:
+            row_data = {
+                canonical: values[col_idx-1] if col_idx <= len(values) else None
+                for canonical, col_idx in header_map.items()
+            }
+            yield category, row_number, row_data, header_map
+
+
+def capture_ipa_styles(ws, kept: list):
+    """
+    Second, optional pass: fill in IPA column styles for the rows that were kept.
+    kept is a list of (row_number, header_map, style_map); style_map is filled in place.
+    """
+    if not kept:
+        return
+    by_row = {}
+    for row_number, header_map, style_map in kept:
+        by_row[row_number] = (header_map, style_map)
+    first, last = min(by_row), max(by_row)
+    for row_number, row in enumerate(ws.iter_rows(min_row=first, max_row=last), start=first):
+        if row_number not in by_row:
+            continue
+        header_map, style_map = by_row[row_number]
+        for canonical, col_idx in header_map.items():
+            if canonical in IPA_COLUMNS and col_idx <= len(row):
+                cell = row[col_idx-1]
+                if cell.fill is not None:
+                    style_map[canonical] = (cell.fill, cell.font, cell.border)
 
 
-def parse_master(input_file: str):
+def parse_master(input_file: str, capture_styles: bool = True):
     """
     Parse a single workbook and collect data rows by category.
+    Reads in read-only mode so rows are streamed rather than held in memory.
     Returns a dict: {category: [(row_data, style_map), ...], ...}
     """
-    wb = load_workbook(input_file, data_only=True)
-    ws = wb.active
-
-    collected = {cat: [] for cat in target_headers}
-    rows = list(ws.iter_rows())
-    i = 0
-
-    while i < len(rows):
-        row = rows[i]
-        # Skip empty rows
-        if all(cell.value is None for cell in row):
-            i += 1
-            continue
-        # Detect header
-        if is_header_row(row):
-            header_map = {}
-            for idx, cell in enumerate(row, start=1):
-                if cell.value and isinstance(cell.value, str):
-                    key = cell.value.strip().lower()
-                    if key in alias_map:
-                        header_map[alias_map[key]] = idx
-            j = i + 1
-            while j < len(rows) and any(c.value is not None for c in rows[j]):
-                status_cell = rows[j][header_map.get('STATUS')-1] if 'STATUS' in header_map else None
-                status_val = status_cell.value if status_cell else None
-                category = detect_category(status_val)
-                if category:
-                    row_data = {}
-                    style_map = {}
-                    for canonical, col_idx in header_map.items():
-                        cell = ws.cell(row=j+1, column=col_idx)
-                        row_data[canonical] = cell.value
-                        if canonical in IPA_COLUMNS:
-                            style_map[canonical] = (cell.fill, cell.font, cell.border)
-                    collected[category].append((row_data, style_map))
-                j += 1
-            i = j
-        else:
-            i += 1
+    wb = load_workbook(input_file, read_only=True, data_only=True)
+    try:
+        ws = wb.active
+        # Some exporters write a missing or stale <dimension>; read every row that is there
+        ws.reset_dimensions()
+        collected = {cat: [] for cat in target_headers}
+        kept = []
+        for category, row_number, row_data, header_map in iter_master_rows(ws):
+            style_map = {}
+            collected[category].append((row_data, style_map))
+            if capture_styles:
+                kept.append((row_number, header_map, style_map))
+        if capture_styles:
+            capture_ipa_styles(ws, kept)
+    finally:
+        wb.close()
     return collected
 
 
+def parse_file_timed(input_file: str, capture_styles: bool = True):
+    """
+    Worker entry point for one workbook.
+    Returns (collected, error_message, seconds); exactly one of collected/error_message is None.
+    """
+    start = time.perf_counter()
+    try:
+        data = parse_master(input_file, capture_styles=capture_styles)
+        return data, None, time.perf_counter() - start
+    except Exception as e:
+        return None, str(e), time.perf_counter() - start
+
+
+@lru_cache(maxsize=1)
+def cache_version() -> str:
+    """Hash of everything a cached parse depends on: the header tables and the parser source."""
+    digest = hashlib.sha256()
+    tables = [IPA_COLUMNS, COMMON_COLUMNS, target_headers, sorted(alias_map.items()),
+              CATEGORY_TOKENS, STATUS_HEADER_KEY]
+    digest.update(json.dumps(tables).encode('utf-8'))
+    parser_code = (_classify_status.__wrapped__, detect_category, is_header_row, iter_master_rows,
+                   capture_ipa_styles, parse_master, _encode_collected, _decode_collected)
+    for func in parser_code:
+        digest.update(inspect.getsource(func).encode('utf-8'))
+    return digest.hexdigest()
+
+
+# Cell values other than str/int/float/bool/None are stored as {tag: text}
+_VALUE_TYPES = {
+    'datetime': (datetime, datetime.isoformat, datetime.fromisoformat),
+    'date': (date, date.isoformat, date.fromisoformat),
+    'time': (dt_time, dt_time.isoformat, dt_time.fromisoformat),
+    'timedelta': (timedelta, timedelta.total_seconds, lambda s: timedelta(seconds=s)),
+}
+_STYLE_TYPES = (Fill, Font, Border)  # Fill.from_tree returns a PatternFill or GradientFill
+
+
+def _encode_value(value):
+    if value is None or isinstance(value, (str, int, float, bool)):
+        return value
+    # datetime before date: a datetime is also a date
+    for tag, (kind, encode, _) in _VALUE_TYPES.items():
+        if isinstance(value, kind):
+            return {tag: encode(value)}
+    return str(value)
+
+
+def _decode_value(value):
+    if isinstance(value, dict):
+        (tag, text), = value.items()
+        return _VALUE_TYPES[tag][2](text)
+    return value
+
+
+def _encode_collected(collected: dict) -> str:
+    """
+    JSON text for a parse result. Each distinct (fill, font, border) is stored once as
+    the XML openpyxl writes for it, and rows refer to it by index.
+    """
+    styles, style_ids = [], {}
+    rows = {}
+    for cat, items in collected.items():
+        rows[cat] = []
+        for row_data, style_map in items:
+            refs = {}
+            for col, style in style_map.items():
+                if style not in style_ids:
+                    style_ids[style] = len(styles)
+                    styles.append([tostring(part.to_tree()).decode('utf-8') for part in style])
+                refs[col] = style_ids[style]
+            rows[cat].append([{col: _encode_value(v) for col, v in row_data.items()}, refs])
+    return json.dumps({'styles': styles, 'rows': rows})
+
+
+def _decode_collected(text: str) -> dict:
+    data = json.loads(text)
+    styles = [
+        tuple(kind.from_tree(fromstring(xml)) for kind, xml in zip(_STYLE_TYPES, parts))
+        for parts in data['styles']
+    ]
+    return {
+        cat: [
+            ({col: _decode_value(v) for col, v in row_data.items()},
+             {col: styles[ref] for col, ref in refs.items()})
+            for row_data, refs in items
+        ]
+        for cat, items in data['rows'].items()
+    }
+
+
+def open_cache(cache_file) -> sqlite3.Connection:
+    """Open (creating if needed) the parse cache database."""
+    conn = sqlite3.connect(str(cache_file))
+    # Older versions pickled results into 'parsed'; those are never loaded
+    conn.execute('DROP TABLE IF EXISTS parsed')
+    conn.execute(
+        """
+        CREATE TABLE IF NOT EXISTS parsed_json (
+            path      TEXT PRIMARY KEY,
+            size      INTEGER NOT NULL,
+            mtime     REAL NOT NULL,
+            sha256    TEXT NOT NULL,
+            version   TEXT NOT NULL,
+            styles    INTEGER NOT NULL,
+            collected TEXT NOT NULL,
+            parsed_at TEXT NOT NULL
+        )
+        """
+    )
+    conn.commit()
+    return conn
+
+
+def file_sha256(path) -> str:
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(1 << 20), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def cache_lookup(conn: sqlite3.Connection, path: Path, capture_styles: bool = True):
+    """
+    Return the cached `collected` dict for an unchanged workbook, or None.
+    Size and mtime are checked first; the content hash is only computed when the
+    size matches but the mtime moved (e.g. the file was copied or re-saved unchanged).
+    """
+    key = str(path.resolve())
+    row = conn.execute(
+        'SELECT size, mtime, sha256, version, styles, collected FROM parsed_json WHERE path = ?', (key,)
+    ).fetchone()
+    if row is None:
+        return None
+    size, mtime, sha, version, styles, text = row
+    if version != cache_version() or (capture_styles and not styles):
+        return None
+    stat = path.stat()
+    if stat.st_size != size:
+        return None
+    if stat.st_mtime != mtime:
+        if file_sha256(path) != sha:
+            return None
+        conn.execute('UPDATE parsed_json SET mtime = ? WHERE path = ?', (stat.st_mtime, key))
+        conn.commit()
+    return _decode_collected(text)
+
+
+def cache_store(conn: sqlite3.Connection, path: Path, collected: dict, capture_styles: bool = True):
+    """Record a freshly parsed workbook in the cache."""
+    stat = path.stat()
+    conn.execute(
+        'INSERT OR REPLACE INTO parsed_json VALUES (?, ?, ?, ?, ?, ?, ?, ?)',
+        (
+            str(path.resolve()), stat.st_size, stat.st_mtime, file_sha256(path), cache_version(),
+            int(capture_styles), _encode_collected(collected),
+            datetime.now().strftime('%Y-%m-%d %H:%M:%S'),
+        )
+    )
+    conn.commit()
+
+
+def _number_format(value):
+    """Number format the old pandas writer gave a value, or None to keep the default."""
+    if isinstance(value, datetime):
+        return DATETIME_FORMAT
+    if isinstance(value, date):
+        return DATE_FORMAT
+    return None
+
+
+def _named_style(wb, registry: dict, style: tuple) -> str:
+    """
+    Return the name of the shared named style for a (fill, font, border) combination,
+    registering it on the workbook the first time it is seen.
+    """
+    name = registry.get(style)
+    if name is None:
+        fill, font, border = style
+        name = f"IPA Style {len(registry) + 1}"
+        named = NamedStyle(name=name)
+        if fill is not None:
+            named.fill = copy(fill)
+        if font is not None:
+            named.font = copy(font)
+        if border is not None:
+            named.border = copy(border)
+        wb.add_named_style(named)
+        registry[style] = name
+    return name
+
+
 def write_master(output_file: str, collected: dict):
     """
     Write the combined collected data into one master Excel file,
     one sheet per category, preserving IPA column styles.
+    Each sheet is built once in write-only mode; every distinct (fill, font, border)
+    combination becomes one shared named style instead of a copy per cell. Dates keep
+    the formats pandas gave them (a named style alone would reset them to General).
     """
-    # Write dataframes
-    with pd.ExcelWriter(output_file, engine='openpyxl') as writer:
-        for cat, rows in collected.items():
-            if not rows:
-                continue
-            data_dicts = [r for r, _ in rows]
-            df = pd.DataFrame(data_dicts)
-            desired = [aliases[0] for aliases in target_headers[cat]]
-            cols = [c for c in desired if c in df.columns]
-            df.reindex(columns=cols).to_excel(writer, sheet_name=cat, index=False)
-
-    # Reopen and apply styles
-    wb2 = load_workbook(output_file)
+    wb = Workbook(write_only=True)
+    # Same look as the pandas header row this writer replaces
+    thin = Side(style='thin')
+    wb.add_named_style(NamedStyle(
+        name=HEADER_STYLE,
+        font=Font(bold=True),
+        border=Border(left=thin, right=thin, top=thin, bottom=thin),
+        alignment=Alignment(horizontal='center', vertical='top'),
+    ))
+    registry = {}
+
     for cat, rows in collected.items():
-        if not rows or cat not in wb2.sheetnames:
+        if not rows:
             continue
-        ws2 = wb2[cat]
-        header_row = next(ws2.iter_rows(min_row=1, max_row=1))
-        dest_header = {cell.value: cell.column for cell in header_row}
-        for idx, (_r, style_map) in enumerate(rows, start=2):
-            for col, (fill, font, border) in style_map.items():
-                if col in dest_header:
-                    dest_cell = ws2.cell(row=idx, column=dest_header[col])
-                    dest_cell.fill = copy(fill)
-                    dest_cell.font = copy(font)
-                    dest_cell.border = copy(border)
-    wb2.save(output_file)
-
-
-def log_to_excel(log_file: str, log_data: list):
-    """Append processing logs to an Excel log sheet."""
-    log_path = Path(log_file)
-    if log_path.exists():
-        book = load_workbook(log_file)
-        writer = pd.ExcelWriter(log_file, engine='openpyxl', mode='a', if_sheet_exists='overlay')
-    else:
-        writer = pd.ExcelWriter(log_file, engine='openpyxl')
-        book = writer.book
-    df_log = pd.DataFrame(log_data)
-    startrow = book['Log'].max_row if 'Log' in book.sheetnames else 0
-    df_log.to_excel(
-        writer,
-        sheet_name='Log',
-        index=False,
-        header=startrow == 0,
-        startrow=startrow
-    )
-    writer.close()
+        present = set()
+        for row_data, _ in rows:
+            present.update(row_data)
+        desired = [aliases[0] for aliases in target_headers[cat]]
+        cols = [c for c in desired if c in present]
+
+        ws = wb.create_sheet(cat)
+        header = []
+        for col in cols:
+            cell = WriteOnlyCell(ws, col)
+            cell.style = HEADER_STYLE
+            header.append(cell)
+        ws.append(header)
+
+        for row_data, style_map in rows:
+            out = []
+            for col in cols:
+                value = row_data.get(col)
+                style = style_map.get(col)
+                if style == DEFAULT_STYLE:
+                    style = None
+                number_format = _number_format(value)
+                if style is None and number_format is None:
+                    out.append(value)
+                    continue
+                cell = WriteOnlyCell(ws, value)
+                if style is not None:
+                    cell.style = _named_style(wb, registry, style)
+                if number_format is not None:
+                    cell.number_format = number_format
+                out.append(cell)
+            ws.append(out)
+
+    wb.save(output_file)
+
+
+def write_history(store_dir, combined: dict, sources: dict) -> int:
+    """
+    Append this run's categorized rows to the columnar history store ('intake' dataset).
+    sources holds the input file name for each row, parallel to combined.
+    """
+    frames = []
+    for cat, rows in combined.items():
+        if not rows:
+            continue
+        df = pd.DataFrame([r for r, _ in rows])
+        df['Input File'] = sources[cat]
+        df['category'] = cat
+        frames.append(df)
+    if not frames:
+        return 0
+    columns = [aliases[0] for aliases in COMMON_COLUMNS] + IPA_COLUMNS
+    return append_history(store_dir, 'intake', pd.concat(frames, ignore_index=True), columns)
 
 
 def main():
@@ -210,6 +513,15 @@ def main():
     )
     parser.add_argument('input_path', help='Path to source Excel file or directory containing Excel files')
     parser.add_argument('output_dir', help='Directory to save output and log files')
+    parser.add_argument('--no-styles', action='store_true',
+                        help='Skip copying IPA column fill/font/border styles (faster)')
+    parser.add_argument('--workers', type=int, default=1,
+                        help='Number of worker processes for parsing workbooks in parallel (default: 1)')
+    parser.add_argument('--rebuild', action='store_true',
+                        help='Ignore the parse cache and re-parse every workbook')
+    parser.add_argument('--history', help='History store directory (default: <output_dir>/history)')
+    parser.add_argument('--no-history', action='store_true',
+                        help='Do not append this run to the history store')
     args = parser.parse_args()
 
     inp = Path(args.input_path)
@@ -218,54 +530,99 @@ def main():
 
     user = getpass.getuser()
     timestamp = lambda: datetime.now().strftime('%Y-%m-%d %H:%M:%S')
-    log_file = out_dir / "processing_log.xlsx"
+    log_file = out_dir / LOG_FILE
     log_records = []
 
     # Prepare combined collector
     combined = {cat: [] for cat in target_headers}
+    sources = {cat: [] for cat in target_headers}
 
     # Gather files
     if inp.is_file():
         files = [inp]
     elif inp.is_dir():
-        files = [f for f in inp.glob('*.xlsx') if not f.name.startswith('~$')]
+        files = sorted(f for f in inp.glob('*.xlsx') if not f.name.startswith('~$'))
     else:
         print(f"Invalid input: {inp}")
         return
 
-    for file in files:
-        print(f"Processing {file.name}...")
-        try:
-            data = parse_master(str(file))
-            for cat in combined:
-                combined[cat].extend(data[cat])
-            log_records.append({
-                'Timestamp': timestamp(),
-                'Username': user,
-                'Input File': file.name,
-                'Sheets Extracted': ', '.join([cat for cat, rows in data.items() if rows]),
-                'Success': True,
-                'Message': 'Merged'
-            })
-        except Exception as e:
-            log_records.append({
-                'Timestamp': timestamp(),
-                'Username': user,
-                'Input File': file.name,
-                'Sheets Extracted': '',
-                'Success': False,
-                'Message': str(e)
-            })
+    # Reuse cached results for workbooks that have not changed since the last run
+    capture_styles = not args.no_styles
+    conn = open_cache(out_dir / CACHE_FILE)
+    cached = {}
+    if not args.rebuild:
+        for file in files:
+            data = cache_lookup(conn, file, capture_styles)
+            if data is not None:
+                cached[file] = data
+
+    # Parse the rest, serially or across a process pool; results come back in file order either way
+    paths = [str(f) for f in files if f not in cached]
+    pool = None
+    if args.workers > 1 and len(paths) > 1:
+        pool = ProcessPoolExecutor(max_workers=args.workers)
+        results = pool.map(parse_file_timed, paths, repeat(capture_styles))
+    else:
+        results = map(parse_file_timed, paths, repeat(capture_styles))
+
+    try:
+        for file in files:
+            if file in cached:
+                data, error, seconds = cached[file], None, 0.0
+                message = 'Cached'
+            else:
+                data, error, seconds = next(results)
+                message = 'Merged'
+                if error is None:
+                    cache_store(conn, file, data, capture_styles)
+            if error is None:
+                print(f"{message} {file.name} ({seconds:.1f}s)")
+                for cat in combined:
+                    combined[cat].extend(data[cat])
+                    sources[cat].extend([file.name] * len(data[cat]))
+                log_records.append({
+                    'Timestamp': timestamp(),
+                    'Username': user,
+                    'Input File': file.name,
+                    'Sheets Extracted': ', '.join([cat for cat, rows in data.items() if rows]),
+                    'Success': True,
+                    'Message': message,
+                    'Seconds': round(seconds, 2)
+                })
+            else:
+                print(f"Failed {file.name}: {error}")
+                log_records.append({
+                    'Timestamp': timestamp(),
+                    'Username': user,
+                    'Input File': file.name,
+                    'Sheets Extracted': '',
+                    'Success': False,
+                    'Message': error,
+                    'Seconds': round(seconds, 2)
+                })
+    finally:
+        if pool is not None:
+            pool.shutdown()
+        conn.close()
 
     # Write single master file
     master_file = out_dir / "ALL_MASTER.xlsx"
     write_master(str(master_file), combined)
     print(f"Master file written to '{master_file}'")
 
+    # Record the run in the columnar history store
+    if not args.no_history:
+        history_dir = Path(args.history) if args.history else out_dir / 'history'
+        if history_available():
+            stored = write_history(history_dir, combined, sources)
+            print(f"{stored} rows added to history in '{history_dir}'")
+        else:
+            print("History not written: pyarrow is not installed (pip install pyarrow)")
+
     # Log results
     if log_records:
-        log_to_excel(str(log_file), log_records)
-        print(f"Log written to '{log_file}'")
+        append_log(log_file, log_records)
+        print(f"Log appended to '{log_file}' (export with: python processing_log.py {out_dir})")
 
 if __name__ == '__main__':
     main()
@@ -4,8 +4,15 @@ This script processes an Excel workbook of provider credentialing sheets and tra
 Usage:
     python credentialing_master_script.py input_file.xlsx -o output_file.xlsx
 """
+import numpy as np
 import pandas as pd
 import argparse
+from pathlib import Path
+from datetime import datetime
+from openpyxl import Workbook
+
+from history_store import append_history, history_available
+from master6 import detect_category
 
 # Mapping from full network names to short codes
 network_map = {
@@ -38,55 +45,131 @@ output_columns = [
     'COUNTY', 'COMMITTEE SUBMISSION DATE', 'STATUS'
 ]
 
+# Output column -> source column for the fields copied straight across
+copied_columns = {
+    'COMMITTEE (Astrana Health)': 'COMMITTEE (Astrana Health)',
+    'LEVEL       (1 or 2)': 'LEVEL       (1 or 2)',
+    'LAST': 'LAST/HDO Name',
+    'FIRST': 'FIRST',
+    'DEGREE': 'DEGREE',
+    'TYPE': 'TYPE (PCP/SCP/AHP/HDO)',
+    'SPECIALTY': 'SPECIALTY',
+    'NPI': 'NPI',
+    'Vendor': 'Vendor',
+    'COUNTY': 'COUNTY',
+    'COMMITTEE SUBMISSION DATE': 'COMMITTEE SUBMISSION DATE',
+    'STATUS': 'STATUS',
+}
+
 def normalize_sheet(df: pd.DataFrame) -> pd.DataFrame:
     """
     Normalize one sheet into the master row format.
+    Works column-wise: the copied fields are renamed in one projection and each
+    network code column comes from a single vectorized comparison.
     """
-    rows = []
-    for _, row in df.iterrows():
-        # Initialize new row dict with blanks
-        new_row = {col: '' for col in output_columns}
-
-        # Copy provider and credentialing info
-        new_row['COMMITTEE (Astrana Health)'] = row.get('COMMITTEE (Astrana Health)', '')
-        new_row['LEVEL       (1 or 2)'] = row.get('LEVEL       (1 or 2)', '')
-        new_row['LAST'] = row.get('LAST/HDO Name', '')
-        new_row['FIRST'] = row.get('FIRST', '')
-        new_row['DEGREE'] = row.get('DEGREE', '')
-        new_row['TYPE'] = row.get('TYPE (PCP/SCP/AHP/HDO)', '')
-        new_row['SPECIALTY'] = row.get('SPECIALTY', '')
-        new_row['NPI'] = row.get('NPI', '')
-        new_row['Vendor'] = row.get('Vendor', '')
-        new_row['COUNTY'] = row.get('COUNTY', '')
-        new_row['COMMITTEE SUBMISSION DATE'] = row.get('COMMITTEE SUBMISSION DATE', '')
-        new_row['STATUS'] = row.get('STATUS', '')
-
-        # Mark network participation with 'x'
-        for full_name, code in network_map.items():
-            # check for 'x' (case-insensitive) in the source column
-            val = str(row.get(full_name, '')).strip().lower()
-            if val == 'x':
-                new_row[code] = 'x'
-
-        rows.append(new_row)
-
-    return pd.DataFrame(rows, columns=output_columns)
+    if df.empty:
+        return pd.DataFrame([], columns=output_columns)
+
+    # Copy provider and credentialing info; anything missing becomes a blank column
+    renames = {src: out for out, src in copied_columns.items() if src in df.columns}
+    master = df[list(renames)].rename(columns=renames)
+    master = master.reindex(columns=output_columns, fill_value='')
+
+    # Mark network participation with 'x' (case-insensitive, surrounding whitespace ignored)
+    for full_name, code in network_map.items():
+        if full_name in df.columns:
+            marked = df[full_name].astype(str).str.strip().str.lower().eq('x')
+            master[code] = np.where(marked.to_numpy(dtype=bool, na_value=False), 'x', '')
+
+    return master.reset_index(drop=True)
+
+
+def iter_normalized_sheets(file_path: str):
+    """
+    Yield the normalized DataFrame for each sheet, one sheet at a time,
+    so only a single sheet is held in memory.
+    """
+    with pd.ExcelFile(file_path) as xl:
+        for sheet_name in xl.sheet_names:
+            yield normalize_sheet(xl.parse(sheet_name))
 
 
 def process_credentialing_file(file_path: str) -> pd.DataFrame:
     """
     Read all sheets from the Excel file and concatenate into a master DataFrame.
     """
-    xl = pd.ExcelFile(file_path)
-    normalized_dfs = []
-    for sheet_name in xl.sheet_names:
-        df_sheet = xl.parse(sheet_name)
-        normalized_dfs.append(normalize_sheet(df_sheet))
     # Combine all providers into one DataFrame
-    master_df = pd.concat(normalized_dfs, ignore_index=True)
+    master_df = pd.concat(iter_normalized_sheets(file_path), ignore_index=True)
     return master_df
 
 
+def _xlsx_rows(df: pd.DataFrame):
+    """Rows of df as plain tuples, with NaN/NaT as empty cells."""
+    cleaned = df.astype(object).where(df.notna(), None)
+    return cleaned.itertuples(index=False, name=None)
+
+
+def write_master_stream(frames, output_file: str) -> int:
+    """
+    Write normalized sheets to output_file as they arrive, dropping each one before the next.
+    The format follows the extension: .xlsx (openpyxl write-only), .csv, or .parquet.
+    Parquet columns are written as strings so every sheet shares one schema.
+    Returns the number of rows written.
+    """
+    fmt = Path(output_file).suffix.lower()
+    written = 0
+
+    if fmt == '.xlsx':
+        wb = Workbook(write_only=True)
+        ws = wb.create_sheet('Sheet1')
+        ws.append(output_columns)
+        for df in frames:
+            for row in _xlsx_rows(df):
+                ws.append(row)
+            written += len(df)
+        wb.save(output_file)
+
+    elif fmt == '.csv':
+        with open(output_file, 'w', newline='', encoding='utf-8') as f:
+            header = True
+            for df in frames:
+                df.to_csv(f, index=False, header=header)
+                header = False
+                written += len(df)
+            if header:
+                pd.DataFrame(columns=output_columns).to_csv(f, index=False)
+
+    elif fmt == '.parquet':
+        # Optional dependency, only needed for Parquet output
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+
+        schema = pa.schema([(col, pa.string()) for col in output_columns])
+        with pq.ParquetWriter(output_file, schema) as writer:
+            for df in frames:
+                as_text = df.astype('string')
+                writer.write_table(pa.Table.from_pandas(as_text, schema=schema, preserve_index=False))
+                written += len(df)
+
+    else:
+        raise ValueError(f"Unsupported output format '{fmt}' (use .xlsx, .csv or .parquet)")
+
+    return written
+
+
+def tee_history(frames, store_dir, source_name: str, run_at: datetime = None):
+    """
+    Pass normalized sheets through unchanged while appending each one to the
+    columnar history store ('master' dataset), categorized by STATUS.
+    """
+    run_at = run_at or datetime.now()
+    for df in frames:
+        categories = {val: detect_category(val) for val in df['STATUS'].unique()}
+        tagged = df.assign(category=df['STATUS'].map(categories), **{'Input File': source_name})
+        append_history(store_dir, 'master', tagged.dropna(subset=['category']), output_columns, run_at=run_at)
+        yield df
+
+
 def main():
     parser = argparse.ArgumentParser(
         description="Generate a master credentialing sheet from multi-sheet input"
@@ -96,14 +179,26 @@ def main():
     )
     parser.add_argument(
         '-o', '--output_file', default='master_output.xlsx',
-        help='Path for the output master Excel file'
+        help='Path for the output master file (.xlsx, .csv or .parquet)'
+    )
+    parser.add_argument(
+        '--history', help='History store directory (default: history/ next to the output file)'
+    )
+    parser.add_argument(
+        '--no-history', action='store_true', help='Do not append this run to the history store'
     )
     args = parser.parse_args()
 
-    # Process and save
-    master_df = process_credentialing_file(args.input_file)
-    master_df.to_excel(args.output_file, index=False)
-    print(f"Master credentialing sheet saved to {args.output_file}")
+    # Normalize and write one sheet at a time
+    frames = iter_normalized_sheets(args.input_file)
+    if not args.no_history:
+        if history_available():
+            history_dir = Path(args.history) if args.history else Path(args.output_file).resolve().parent / 'history'
+            frames = tee_history(frames, history_dir, Path(args.input_file).name)
+        else:
+            print("History not written: pyarrow is not installed (pip install pyarrow)")
+    written = write_master_stream(frames, args.output_file)
+    print(f"Master credentialing sheet saved to {args.output_file} ({written} rows)")
 
 if __name__ == '__main__':
     main()
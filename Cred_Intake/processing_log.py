@@ -0,0 +1,138 @@
+#!/usr/bin/env python3
+"""
+Append-only processing log for the intake scripts.
+
+Each run appends one JSON object per line to processing_log.jsonl, so logging costs the
+same no matter how long the history is. When the file passes LOG_MAX_BYTES, or its oldest
+record is older than LOG_MAX_DAYS, it is renamed to processing_log.<timestamp>.jsonl and
+a fresh file is started.
+
+History from the old Excel log (processing_log.xlsx, which master6.py used to append to)
+is copied once into processing_log.legacy.jsonl the first time the log is used, and is
+always part of the export. The old workbook itself is left untouched.
+
+The Excel view is only built on demand:
+    python processing_log.py /path/to/output_dir [-o processing_log_export.xlsx] [--all]
+"""
+import argparse
+import json
+from datetime import datetime, timedelta
+from pathlib import Path
+
+import pandas as pd
+
+LOG_FILE = 'processing_log.jsonl'
+LEGACY_XLSX = 'processing_log.xlsx'
+EXPORT_FILE = 'processing_log_export.xlsx'
+LOG_MAX_BYTES = 5 * 1024 * 1024
+LOG_MAX_DAYS = 90
+
+
+def _first_timestamp(log_path: Path):
+    """Timestamp of the oldest record in the file (reads only the first line)."""
+    with open(log_path, 'r', encoding='utf-8') as f:
+        first = f.readline()
+    try:
+        return datetime.strptime(json.loads(first)['Timestamp'], '%Y-%m-%d %H:%M:%S')
+    except (ValueError, KeyError, TypeError):
+        return None
+
+
+def rotate_log(log_path: Path, max_bytes: int = LOG_MAX_BYTES, max_days: int = LOG_MAX_DAYS):
+    """Move the current log aside if it is too big or too old. Returns the rotated path, if any."""
+    if not log_path.exists() or log_path.stat().st_size == 0:
+        return None
+    too_big = max_bytes and log_path.stat().st_size >= max_bytes
+    oldest = _first_timestamp(log_path)
+    too_old = max_days and oldest is not None and datetime.now() - oldest > timedelta(days=max_days)
+    if not (too_big or too_old):
+        return None
+    stamp = datetime.now().strftime('%Y%m%d-%H%M%S')
+    rotated = log_path.with_name(f"{log_path.stem}.{stamp}{log_path.suffix}")
+    n = 1
+    while rotated.exists():
+        rotated = log_path.with_name(f"{log_path.stem}.{stamp}-{n}{log_path.suffix}")
+        n += 1
+    log_path.rename(rotated)
+    return rotated
+
+
+def _legacy_path(log_path: Path) -> Path:
+    return log_path.with_name(f"{log_path.stem}.legacy{log_path.suffix}")
+
+
+def import_legacy_log(log_file):
+    """
+    Copy the rows of the old Excel log next to `log_file` into processing_log.legacy.jsonl,
+    once. Returns the number of rows imported (0 if there was nothing to do).
+    """
+    log_path = Path(log_file)
+    legacy_xlsx = log_path.with_name(LEGACY_XLSX)
+    legacy_path = _legacy_path(log_path)
+    if legacy_path.exists() or not legacy_xlsx.exists():
+        return 0
+    df_old = pd.read_excel(legacy_xlsx, sheet_name='Log')
+    df_old = df_old.astype(object).where(df_old.notna(), None)
+    # Write under a temporary name so an interrupted import is retried next time
+    tmp_path = legacy_path.with_name(legacy_path.name + '.tmp')
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        for record in df_old.to_dict('records'):
+            f.write(json.dumps(record, default=str) + '\n')
+    tmp_path.replace(legacy_path)
+    return len(df_old)
+
+
+def append_log(log_file, log_data: list, max_bytes: int = LOG_MAX_BYTES, max_days: int = LOG_MAX_DAYS):
+    """Append processing records to the line-oriented log, rotating first if needed."""
+    log_path = Path(log_file)
+    import_legacy_log(log_path)
+    rotate_log(log_path, max_bytes, max_days)
+    with open(log_path, 'a', encoding='utf-8') as f:
+        for record in log_data:
+            f.write(json.dumps(record, default=str) + '\n')
+
+
+def read_log(log_file, include_rotated: bool = False) -> pd.DataFrame:
+    """
+    Load the log into a DataFrame, oldest records first: the imported Excel history,
+    then (optionally) the rotated logs, then the current log.
+    """
+    log_path = Path(log_file)
+    import_legacy_log(log_path)
+    legacy_path = _legacy_path(log_path)
+    paths = [legacy_path] if legacy_path.exists() else []
+    if include_rotated:
+        rotated = (p for p in log_path.parent.glob(f"{log_path.stem}.*{log_path.suffix}") if p != legacy_path)
+        paths.extend(sorted(rotated, key=lambda p: p.stat().st_mtime))
+    if log_path.exists():
+        paths.append(log_path)
+
+    records = []
+    for path in paths:
+        with open(path, 'r', encoding='utf-8') as f:
+            records.extend(json.loads(line) for line in f if line.strip())
+    return pd.DataFrame(records)
+
+
+def export_log(log_file, output_file, include_rotated: bool = False) -> int:
+    """Render the log as an Excel sheet named 'Log'. Returns the number of records."""
+    df_log = read_log(log_file, include_rotated)
+    df_log.to_excel(output_file, sheet_name='Log', index=False)
+    return len(df_log)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Export the processing log to Excel.')
+    parser.add_argument('log_dir', help='Directory holding processing_log.jsonl (the master6.py output directory)')
+    parser.add_argument('-o', '--output_file', help=f'Excel file to write (default: <log_dir>/{EXPORT_FILE})')
+    parser.add_argument('--all', action='store_true', help='Include rotated log files')
+    args = parser.parse_args()
+
+    log_dir = Path(args.log_dir)
+    output_file = args.output_file or log_dir / EXPORT_FILE
+    count = export_log(log_dir / LOG_FILE, output_file, include_rotated=args.all)
+    print(f"{count} log records written to '{output_file}'")
+
+
+if __name__ == '__main__':
+    main()
@@ -1,59 +1,123 @@
-import requests
+import os
+import sys
 import tkinter as tk
 from tkinter import ttk
 from tkinter import messagebox
-import openpyxl
 from tkinter import filedialog
 
+# The shared NPI client lives with the other registry tools
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), os.pardir, "Provider_Data", "NPI_Registry_tools"))
+from npi_background import BackgroundLookup, parse_npi_text, read_npis_from_file
+from npi_cache import NPICache
+from npi_client import NPIClient
+from npi_export import write_rows_xlsx
+from npi_records import normalize
+from npi_validate import format_invalid, validate_npis
+from nucc_taxonomy import describe, missing_table_message, table_missing
+
+# One pooled, rate-limited client for the whole session
+client = NPIClient(cache=NPICache(stale_while_revalidate=True))
+
+# How often (ms) the GUI picks up finished lookups from the background thread
+POLL_MS = 100
+current_lookup = None
+lookup_errors = []
+
+def na(value):
+    """Show blanks as N/A in the table."""
+    return value if value else "N/A"
+
+def result_row(record):
+    """Table row for one NPIRecord: details plus up to three primary taxonomies."""
+    if not record.found:
+        return [record.npi, "Not Found", "N/A", "N/A", "N/A", "N/A", "N/A", "N/A", "N/A", "N/A"]
+    taxonomy_data = [f"{na(code)} - {na(describe(code))}" for code, _ in record.primary_taxonomies]
+    return [
+        record.npi,
+        na(record.display_name),
+        na(record.sex),
+        na(record.npi_type),
+        na(record.address),
+        na(record.city),
+        na(record.state),
+        na(record.zip5),
+        na(record.phone.replace("-", "")),
+        na(record.fax.replace("-", "")),
+    ] + taxonomy_data[:3]
+
 # Function to retrieve NPI data from the NPI Registry API
 def fetch_npi_data():
-    npi_numbers = [entry.get() for entry in npi_entries if entry.get().strip()]
+    global current_lookup, lookup_errors
+    # Malformed NPIs and bad check digits are dropped before any request goes out
+    npi_numbers, invalid = validate_npis(parse_npi_text(npi_input.get("1.0", tk.END)))
+    if invalid:
+        messagebox.showwarning("Invalid NPIs", f"{len(invalid)} entries skipped:\n{format_invalid(invalid, limit=10)}")
     if not npi_numbers:
-        messagebox.showwarning("Input Error", "Please enter at least one NPI number.")
+        messagebox.showwarning("Input Error", "Please enter at least one valid NPI number.")
         return
 
-    results = []
-    for npi in npi_numbers:
-        response = requests.get(f"https://npiregistry.cms.hhs.gov/api/?number={npi}&version=2.1")
-        data = response.json()
-        if data.get("results"):
-            result = data["results"][0]
-            npi_type = result.get("enumeration_type", "N/A")
-
-            provider_name = "Not Found"
-            provider_gender = "N/A"
-            if npi_type == "NPI-1":  # Individual
-                provider_name = f"{result['basic'].get('last_name', '')}, {result['basic'].get('first_name', '')}".strip(", ")
-                provider_gender = result["basic"].get("gender", "N/A")
-            elif npi_type == "NPI-2":  # Organization
-                provider_name = result['basic'].get("organization_name", "N/A")
-            
-            primary_address = result["addresses"][0]
-            address = primary_address.get("address_1", "N/A")
-            city = primary_address.get("city", "N/A")
-            state = primary_address.get("state", "N/A")
-            zip_code = primary_address.get("postal_code", "N/A").split('-')[0]
-            phone = primary_address.get("telephone_number", "N/A").replace("-","")
-            fax = primary_address.get("fax_number", "N/A").replace("-","")
-
-            taxonomies = result.get("taxonomies", [])
-            primary_taxonomies = [
-                taxonomy for taxonomy in taxonomies
-                if taxonomy.get('primary', False)
-            ]
-            taxonomy_data = [f"{taxonomy.get('code', 'N/A')} - {taxonomy.get('desc', 'N/A')}" for taxonomy in primary_taxonomies]
-
-            results.append([npi, provider_name, provider_gender, npi_type, address, city, state, zip_code, phone, fax] + taxonomy_data[:3])
-        else:
-            results.append([npi, "Not Found", "N/A", "N/A", "N/A", "N/A", "N/A", "N/A", "N/A", "N/A"])
-
     for row in table.get_children():
         table.delete(row)
+    update_record_count()
 
-    for result in results:
-        table.insert("", "end", values=result)
+    # Run the lookups on a worker thread; poll_lookup() streams results into the table
+    lookup_errors = []
+    current_lookup = BackgroundLookup(client, npi_numbers)
+    progress.config(maximum=len(npi_numbers), value=0)
+    progress_label.config(text=f"0 / {len(npi_numbers)}")
+    submit_button.config(state="disabled")
+    cancel_button.config(state="normal")
+    app.after(POLL_MS, poll_lookup, current_lookup)
+
+def poll_lookup(lookup):
+    """Move finished lookups from the worker into the table, then reschedule until the batch ends."""
+    global current_lookup
+    if lookup is not current_lookup:
+        return  # cleared or superseded by a newer batch
+    finished = lookup.drain()
+    for npi, result, error in finished:
+        if error is not None:
+            lookup_errors.append(f"{npi}: {error}")
+            continue
+        table.insert("", "end", values=result_row(normalize(npi, result)))
+
+    if finished:
+        progress.step(len(finished))
+        progress_label.config(text=f"{int(progress['value'])} / {lookup.total}")
+        update_record_count()
+
+    if not lookup.finished:
+        app.after(POLL_MS, poll_lookup, lookup)
+        return
 
-    update_record_count()
+    current_lookup = None
+    submit_button.config(state="normal")
+    cancel_button.config(state="disabled")
+    if lookup.cancelled:
+        progress_label.config(text=f"Cancelled at {int(progress['value'])} / {lookup.total}")
+    if lookup_errors:
+        shown = "\n".join(lookup_errors[:10])
+        more = f"\n...and {len(lookup_errors) - 10} more" if len(lookup_errors) > 10 else ""
+        messagebox.showerror("Network/API Error", f"{len(lookup_errors)} lookup(s) failed:\n{shown}{more}")
+
+def cancel_fetch():
+    if current_lookup is not None:
+        current_lookup.cancel()
+        cancel_button.config(state="disabled")
+
+def load_npis_from_file():
+    filepath = filedialog.askopenfilename(
+        filetypes=[("NPI lists", "*.xlsx *.xlsm *.csv *.txt"), ("All files", "*.*")],
+    )
+    if not filepath:
+        return
+    try:
+        npis = read_npis_from_file(filepath)
+    except Exception as e:
+        messagebox.showerror("File Error", f"Could not read {filepath}: {e}")
+        return
+    npi_input.delete("1.0", tk.END)
+    npi_input.insert("1.0", "\n".join(npis))
 
 def display_details(event):
     selected_item = table.selection()
@@ -65,8 +129,16 @@ def display_details(event):
         details_text.config(state="disabled")
 
 def clear_entries():
-    for entry in npi_entries:
-        entry.delete(0, tk.END)
+    global current_lookup
+    # Stop any running batch; its remaining results are discarded
+    if current_lookup is not None:
+        current_lookup.cancel()
+        current_lookup = None
+        submit_button.config(state="normal")
+        cancel_button.config(state="disabled")
+    progress.config(value=0)
+    progress_label.config(text="")
+    npi_input.delete("1.0", tk.END)
 
 def update_record_count():
     count = len(table.get_children())
@@ -80,16 +152,8 @@ def save_results_to_excel():
     if not filepath:
         return
     
-    wb = openpyxl.Workbook()
-    ws = wb.active
-    ws.title = "NPI Results"
-    ws.append([col for col in columns])
-    
-    for row in table.get_children():
-        row_data = table.item(row, "values")
-        ws.append(row_data)
-    
-    wb.save(filepath)
+    rows = (table.item(row, "values") for row in table.get_children())
+    write_rows_xlsx(filepath, columns, rows, sheet_name="NPI Results")
     messagebox.showinfo("Success", "Results saved successfully!")
 
 app = tk.Tk()
@@ -100,17 +164,27 @@ app.configure(bg="#2b2b2b")
 left_frame = tk.Frame(app, bg="#2b2b2b")
 left_frame.grid(row=0, column=0, padx=10, pady=10, sticky="n")
 
-instructions = tk.Label(left_frame, text="NPI Search:", bg="#2b2b2b", fg="white")
+instructions = tk.Label(left_frame, text="NPI Search (one per line):", bg="#2b2b2b", fg="white")
 instructions.pack()
 
-npi_entries = []
-for i in range(15):
-    entry = tk.Entry(left_frame, width=20)
-    entry.pack(pady=2)
-    npi_entries.append(entry)
+input_frame = tk.Frame(left_frame, bg="#2b2b2b")
+input_frame.pack(pady=2)
+npi_input = tk.Text(input_frame, width=20, height=15)
+input_scrollbar = ttk.Scrollbar(input_frame, orient="vertical", command=npi_input.yview)
+npi_input.config(yscrollcommand=input_scrollbar.set)
+npi_input.pack(side="left")
+input_scrollbar.pack(side="right", fill="y")
 
+load_button = tk.Button(left_frame, text="Load from File", command=load_npis_from_file, bg="#404040", fg="white")
+load_button.pack(pady=5)
 submit_button = tk.Button(left_frame, text="Fetch NPI Data", command=fetch_npi_data, bg="#404040", fg="white")
 submit_button.pack(pady=10)
+cancel_button = tk.Button(left_frame, text="Cancel", command=cancel_fetch, state="disabled", bg="#404040", fg="white")
+cancel_button.pack(pady=5)
+progress = ttk.Progressbar(left_frame, orient="horizontal", length=150, mode="determinate")
+progress.pack(pady=5)
+progress_label = tk.Label(left_frame, text="", bg="#2b2b2b", fg="white")
+progress_label.pack()
 clear_button = tk.Button(left_frame, text="Clear Entries", command=clear_entries, bg="#404040", fg="white")
 clear_button.pack(pady=10)
 save_button = tk.Button(left_frame, text="Save to Excel", command=save_results_to_excel, bg="#404040", fg="white")
@@ -143,4 +217,8 @@ details_text.pack(fill="x", expand=True)
 record_count_label = tk.Label(right_frame, text="Record count: 0", bg="#2b2b2b", fg="white")
 record_count_label.pack(fill="x", padx=10, pady=5)
 
+# Without the NUCC CSV most taxonomy descriptions would just show N/A; say why up front
+if table_missing():
+    app.after(0, lambda: messagebox.showwarning("Taxonomy table missing", missing_table_message()))
+
 app.mainloop()
@@ -5,7 +5,9 @@ import re
 import sys
 from pathlib import Path
 
-from PyPDF2 import PdfReader
+# PDF text comes from the shared cache next to the other profile tools
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), os.pardir, "Profile_Searching"))
+from pdf_text import extract_text
 
 # regex to detect dates like 6/20/2025 or 06-20-2025
 DATE_REGEX = re.compile(r'^\s*\d{1,2}[/-]\d{1,2}[/-]\d{2,4}\s*$')
@@ -22,10 +24,10 @@ def extract_provider_name(pdf_path: Path) -> str:
     Reads the first page of the PDF and returns the provider name.
     If line1 is a date, returns line2; otherwise returns line1.
     """
-    reader = PdfReader(str(pdf_path))
-    if not reader.pages:
+    pages = extract_text(str(pdf_path), pages=[0], engine="pypdf2")
+    if not pages:
         raise ValueError(f"No pages found in {pdf_path}")
-    text = reader.pages[0].extract_text() or ""
+    text = pages[0]
     lines = [line.strip() for line in text.splitlines() if line.strip()]
     if not lines:
         raise ValueError(f"No text found in first page of {pdf_path}")
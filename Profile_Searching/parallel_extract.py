@@ -0,0 +1,142 @@
+#!/usr/bin/env python3
+"""
+Process pool for per-file work (text extraction, matching) with per-file timeouts.
+
+A walker thread feeds paths into a bounded queue while N worker processes handle one
+file at a time, so walking a big share overlaps with the CPU-bound PDF parsing and
+never runs far ahead of it. Results come back as soon as each file finishes.
+
+concurrent.futures cannot stop a task once it is running. Here each worker has its own
+pipe, so a worker stuck on a pathological file past the timeout is terminated and
+replaced, and that file is reported as timed out instead of stalling the search.
+
+Workers are started only as items arrive, so an empty input starts no processes and a
+short one never starts more workers than it has items.
+"""
+import multiprocessing as mp
+import os
+import queue
+import threading
+import time
+from multiprocessing.connection import wait
+
+_DONE = object()
+
+
+def _worker(func, conn):
+    while True:
+        try:
+            item = conn.recv()
+        except EOFError:
+            break
+        if item is None:
+            break
+        try:
+            conn.send((item, func(item), None))
+        except Exception as exc:
+            # Exceptions are sent as text: not every exception type pickles
+            conn.send((item, None, f"{type(exc).__name__}: {exc}"))
+
+
+class _Slot:
+    """One worker process and the task it is currently running."""
+
+    def __init__(self, func):
+        self.func = func
+        self.item = None
+        self.started = 0.0
+        self.start()
+
+    def start(self):
+        self.conn, child = mp.Pipe()
+        self.proc = mp.Process(target=_worker, args=(self.func, child), daemon=True)
+        self.proc.start()
+        child.close()
+
+    def restart(self):
+        self.proc.terminate()
+        self.proc.join()
+        self.conn.close()
+        self.item = None
+        self.start()
+
+    def stop(self):
+        if self.item is not None:
+            self.proc.terminate()  # abandoned mid-file, e.g. the caller stopped early
+        else:
+            try:
+                self.conn.send(None)
+            except (BrokenPipeError, OSError):
+                pass
+        self.proc.join(timeout=5)
+        if self.proc.is_alive():
+            self.proc.terminate()
+        self.conn.close()
+
+
+def imap_unordered(func, items, workers: int = None, timeout: float = 60.0, queue_size: int = None):
+    """
+    Run func(item) for every item in worker processes; yields (item, result, error) as
+    each finishes. error is None, a message string, or a TimeoutError for items that ran
+    longer than `timeout` seconds. func must be picklable (a module-level function or a
+    functools.partial of one). Worker processes are started lazily, at most one per item.
+    """
+    workers = workers or os.cpu_count() or 1
+    feed = queue.Queue(maxsize=queue_size or workers * 4)
+
+    def walk():
+        try:
+            for item in items:
+                feed.put(item)
+        finally:
+            feed.put(_DONE)
+
+    threading.Thread(target=walk, daemon=True).start()
+
+    slots = []
+    exhausted = False
+    try:
+        while True:
+            # Hand out work to idle workers, starting new ones up to `workers`
+            # (block only when nothing is running)
+            while not exhausted:
+                slot = next((s for s in slots if s.item is None), None)
+                if slot is None and len(slots) >= workers:
+                    break
+                busy = any(s.item is not None for s in slots)
+                try:
+                    item = feed.get(timeout=0.05) if busy else feed.get()
+                except queue.Empty:
+                    break
+                if item is _DONE:
+                    exhausted = True
+                    break
+                if slot is None:
+                    slot = _Slot(func)
+                    slots.append(slot)
+                slot.item, slot.started = item, time.monotonic()
+                slot.conn.send(item)
+
+            running = [slot for slot in slots if slot.item is not None]
+            if not running:
+                if exhausted:
+                    return
+                continue
+
+            ready = wait([slot.conn for slot in running], timeout=0.1)
+            for slot in running:
+                if slot.conn in ready:
+                    try:
+                        item, result, error = slot.conn.recv()
+                    except EOFError:
+                        item, result, error = slot.item, None, "worker process exited"
+                        slot.restart()
+                    slot.item = None
+                    yield item, result, error
+                elif time.monotonic() - slot.started > timeout:
+                    item = slot.item
+                    slot.restart()
+                    yield item, None, TimeoutError(f"no result after {timeout:g}s")
+    finally:
+        for slot in slots:
+            slot.stop()
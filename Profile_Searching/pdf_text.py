@@ -0,0 +1,242 @@
+#!/usr/bin/env python3
+"""
+Shared, content-addressed cache of PDF page text for the profile tools.
+
+Every tool that reads provider-profile PDFs (profile_checker.py, wordsearch1.py,
+PDF_print.py, PDF_Handlers/2025Profile_rename2.py) goes through extract_text() or
+iter_pages() instead of opening the PDF itself. Page text is stored in SQLite keyed by
+the SHA-256 of the file's bytes, the extraction engine (pdfplumber and PyPDF2 lay text
+out differently) and the page number, so a profile is parsed at most once per engine
+no matter how often it is renamed, copied or searched. Pages are parsed and stored on
+demand: asking for the first page of a 40-page PDF parses one page.
+
+Path -> hash lookups are remembered with the file's size and mtime, so an unchanged
+directory costs one stat per file and no hashing.
+
+The cache defaults to ~/.pdf_text_cache.sqlite (override with PDF_TEXT_CACHE).
+
+Usage (pre-extract a directory, e.g. overnight):
+    python pdf_text.py "P:\\Profiles" [--engine pypdf2] [--workers 4]
+"""
+import argparse
+import hashlib
+import os
+import sqlite3
+from functools import partial
+from pathlib import Path
+
+CACHE_PATH = os.getenv("PDF_TEXT_CACHE", str(Path.home() / ".pdf_text_cache.sqlite"))
+DEFAULT_ENGINE = "pdfplumber"
+HASH_BLOCK = 1 << 20
+
+
+class _PlumberReader:
+    def __init__(self, path: str):
+        import pdfplumber
+
+        self._pdf = pdfplumber.open(path)
+        self.page_count = len(self._pdf.pages)
+
+    def page_text(self, index: int) -> str:
+        page = self._pdf.pages[index]
+        try:
+            return page.extract_text() or ""
+        finally:
+            page.close()  # drop the page's parsed layout objects
+
+    def close(self):
+        self._pdf.close()
+
+
+class _PyPDF2Reader:
+    def __init__(self, path: str):
+        from PyPDF2 import PdfReader
+
+        self._file = open(path, "rb")
+        try:
+            self._reader = PdfReader(self._file)
+            self.page_count = len(self._reader.pages)
+        except Exception:
+            self._file.close()
+            raise
+
+    def page_text(self, index: int) -> str:
+        return self._reader.pages[index].extract_text() or ""
+
+    def close(self):
+        self._file.close()
+
+
+ENGINES = {"pdfplumber": _PlumberReader, "pypdf2": _PyPDF2Reader}
+
+
+def file_digest(path: str) -> str:
+    """SHA-256 of a file's contents, as hex."""
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(HASH_BLOCK), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+class PDFTextCache:
+    """Per-page PDF text keyed by (content hash, engine, page number)."""
+
+    def __init__(self, path: str = CACHE_PATH):
+        self.path = path
+        # Autocommit: every stored page is visible to (and never blocks) other processes for long
+        self._conn = sqlite3.connect(path, timeout=60, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript(
+            """
+            CREATE TABLE IF NOT EXISTS files (
+                path   TEXT PRIMARY KEY,
+                mtime  REAL NOT NULL,
+                size   INTEGER NOT NULL,
+                digest TEXT NOT NULL
+            );
+            CREATE TABLE IF NOT EXISTS documents (
+                digest     TEXT NOT NULL,
+                engine     TEXT NOT NULL,
+                page_count INTEGER NOT NULL,
+                PRIMARY KEY (digest, engine)
+            ) WITHOUT ROWID;
+            CREATE TABLE IF NOT EXISTS pages (
+                digest TEXT NOT NULL,
+                engine TEXT NOT NULL,
+                page   INTEGER NOT NULL,
+                text   TEXT NOT NULL,
+                PRIMARY KEY (digest, engine, page)
+            ) WITHOUT ROWID;
+            """
+        )
+
+    def close(self):
+        self._conn.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def digest(self, path: str) -> str:
+        """Content hash of `path`, re-hashing only when its size or mtime changed."""
+        path = os.path.abspath(path)
+        stat = os.stat(path)
+        row = self._conn.execute("SELECT mtime, size, digest FROM files WHERE path = ?", (path,)).fetchone()
+        if row is not None and row[0] == stat.st_mtime and row[1] == stat.st_size:
+            return row[2]
+        digest = file_digest(path)
+        self._conn.execute(
+            "INSERT OR REPLACE INTO files (path, mtime, size, digest) VALUES (?, ?, ?, ?)",
+            (path, stat.st_mtime, stat.st_size, digest),
+        )
+        return digest
+
+    def iter_pages(self, path: str, pages=None, engine: str = DEFAULT_ENGINE):
+        """
+        Yield the text of each requested page (0-based indexes, all pages by default).
+        Pages past the end of the document are skipped. The PDF is only opened if a
+        requested page is not cached yet, and stops being parsed as soon as the
+        caller stops iterating.
+        """
+        if engine not in ENGINES:
+            raise ValueError(f"unknown PDF engine {engine!r} (choose from {', '.join(ENGINES)})")
+        digest = self.digest(path)
+        row = self._conn.execute(
+            "SELECT page_count FROM documents WHERE digest = ? AND engine = ?", (digest, engine)
+        ).fetchone()
+        reader = None
+        try:
+            if row is None:
+                reader = ENGINES[engine](path)
+                page_count = reader.page_count
+                self._conn.execute(
+                    "INSERT OR REPLACE INTO documents (digest, engine, page_count) VALUES (?, ?, ?)",
+                    (digest, engine, page_count),
+                )
+            else:
+                page_count = row[0]
+
+            for page in range(page_count) if pages is None else pages:
+                if not 0 <= page < page_count:
+                    continue
+                cached = self._conn.execute(
+                    "SELECT text FROM pages WHERE digest = ? AND engine = ? AND page = ?", (digest, engine, page)
+                ).fetchone()
+                if cached is not None:
+                    yield cached[0]
+                    continue
+                if reader is None:
+                    reader = ENGINES[engine](path)
+                text = reader.page_text(page)
+                self._conn.execute(
+                    "INSERT OR REPLACE INTO pages (digest, engine, page, text) VALUES (?, ?, ?, ?)",
+                    (digest, engine, page, text),
+                )
+                yield text
+        finally:
+            if reader is not None:
+                reader.close()
+
+
+_cache = None
+_cache_pid = None
+
+
+def default_cache() -> PDFTextCache:
+    """The process-wide cache at CACHE_PATH (reopened in forked worker processes)."""
+    global _cache, _cache_pid
+    if _cache is None or _cache_pid != os.getpid():
+        _cache, _cache_pid = PDFTextCache(), os.getpid()
+    return _cache
+
+
+def iter_pages(path: str, pages=None, engine: str = DEFAULT_ENGINE):
+    """Yield cached (or freshly extracted) page text; see PDFTextCache.iter_pages."""
+    return default_cache().iter_pages(path, pages, engine)
+
+
+def extract_text(path: str, pages=None, engine: str = DEFAULT_ENGINE) -> list:
+    """List of page texts for `pages` (0-based, default all) of the PDF at `path`."""
+    return list(iter_pages(path, pages, engine))
+
+
+def _warm_one(path: str, engine: str) -> int:
+    return len(extract_text(path, engine=engine))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Extract every PDF under a directory into the shared text cache.")
+    parser.add_argument("directory")
+    parser.add_argument("--engine", choices=sorted(ENGINES), default=DEFAULT_ENGINE,
+                        help="Extractor to cache for (profile_checker/PDF_print: pdfplumber; "
+                             "wordsearch1/2025Profile_rename2: pypdf2)")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1, help="Extraction processes")
+    parser.add_argument("--timeout", type=float, default=120.0, help="Give up on a PDF after this many seconds")
+    args = parser.parse_args()
+
+    from parallel_extract import imap_unordered
+
+    paths = (
+        os.path.join(root, fname)
+        for root, _, files in os.walk(args.directory)
+        for fname in files
+        if fname.lower().endswith(".pdf")
+    )
+    files = pages = failed = 0
+    for path, count, error in imap_unordered(partial(_warm_one, engine=args.engine), paths,
+                                             workers=args.workers, timeout=args.timeout):
+        if error is not None:
+            failed += 1
+            print(f"Warning: failed to read {path!r}: {error}")
+        else:
+            files += 1
+            pages += count
+    print(f"{files} PDFs ({pages} pages) cached in {CACHE_PATH}, {failed} failed")
+
+
+if __name__ == "__main__":
+    main()
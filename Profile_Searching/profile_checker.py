@@ -1,9 +1,13 @@
 import os
 import re
-import pdfplumber
 import openpyxl
 from openpyxl import Workbook
 
+from parallel_extract import imap_unordered
+from pdf_text import iter_pages
+
+PDF_TIMEOUT = 120  # seconds before a stuck PDF is skipped
+
 # Define the full list of IPA headers
 IPA_HEADERS = [
     "NPI",
@@ -27,39 +31,74 @@ IPA_HEADERS = [
     "Filenames Found"
 ]
 
-def extract_npi_and_networks(pdf_path):
+# Whitespace after "NPI:" must be on the same line, as when lines were matched one at a time
+NPI_PATTERN = re.compile(r"NPI:[^\S\n]*(\d{10})")
+NETWORK_LABEL = "IPA Medical Group(s):"
+
+
+def scan_profile_pages(pages):
+    """
+    Single pass over a profile's page texts. Returns (npi, networks): the first NPI found
+    and, for every "IPA Medical Group(s):" line, the next non-blank line after it (which
+    may be on the following page).
+    """
     npi = None
     networks = []
+    want_network = False
+    for text in pages:
+        if npi is None:
+            match = NPI_PATTERN.search(text)
+            if match:
+                npi = match.group(1)
+        if not want_network and NETWORK_LABEL not in text:
+            continue
+        for line in text.splitlines():
+            if want_network and line.strip():
+                networks.append(line.strip())
+                want_network = False
+            if NETWORK_LABEL in line:
+                want_network = True
+    return npi, networks
+
+
+def extract_npi_and_networks(pdf_path):
     try:
-        with pdfplumber.open(pdf_path) as pdf:
-            for page in pdf.pages:
-                lines = page.extract_text().splitlines()
-                for line in lines:
-                    # Extract NPI
-                    npi_match = re.search(r"NPI:\s*(\d{10})", line)
-                    if npi_match:
-                        npi = npi_match.group(1)
-                    # Extract Network
-                    if "IPA Medical Group(s):" in line:
-                        idx = lines.index(line)
-                        if idx + 1 < len(lines):
-                            networks.append(lines[idx + 1].strip())
+        return scan_profile_pages(iter_pages(pdf_path))
     except Exception as e:
         print(f"Failed to read {pdf_path}: {e}")
-    return npi, networks
+        return None, []
+
+
+def collect_pdf_data(pdf_dir, workers=None):
+    """
+    Map NPI -> {"networks", "files"} for every profile PDF under pdf_dir. PDFs are read
+    by `workers` processes (default: all cores); files keep the directory walk order.
+    """
+    paths = [
+        os.path.join(root, file)
+        for root, _, files in os.walk(pdf_dir)
+        for file in files
+        if file.lower().endswith(".pdf")
+    ]
+    workers = workers or os.cpu_count() or 1
+    if workers <= 1:
+        results = {path: extract_npi_and_networks(path) for path in paths}
+    else:
+        results = {}
+        for path, result, error in imap_unordered(extract_npi_and_networks, paths, workers, timeout=PDF_TIMEOUT):
+            if error is not None:
+                print(f"Failed to read {path}: {error}")
+            else:
+                results[path] = result
 
-def collect_pdf_data(pdf_dir):
     pdf_data = {}
-    for root, _, files in os.walk(pdf_dir):
-        for file in files:
-            if file.lower().endswith(".pdf"):
-                path = os.path.join(root, file)
-                npi, networks = extract_npi_and_networks(path)
-                if npi:
-                    if npi not in pdf_data:
-                        pdf_data[npi] = {"networks": set(), "files": []}
-                    pdf_data[npi]["networks"].update(networks)
-                    pdf_data[npi]["files"].append(file)
+    for path in paths:
+        npi, networks = results.get(path, (None, []))
+        if npi:
+            if npi not in pdf_data:
+                pdf_data[npi] = {"networks": set(), "files": []}
+            pdf_data[npi]["networks"].update(networks)
+            pdf_data[npi]["files"].append(os.path.basename(path))
     return pdf_data
 
 def load_npis_from_excel(sheet_path, column):
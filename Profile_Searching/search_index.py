@@ -0,0 +1,191 @@
+#!/usr/bin/env python3
+"""
+Incremental on-disk full-text index for wordsearch1.py.
+
+Extracted file text is kept in a SQLite FTS5 table using the trigram tokenizer, which
+matches case-insensitive substrings of three or more characters. Indexed queries
+therefore keep wordsearch1's semantics: every term (word or phrase) must appear
+somewhere in the file. Shorter terms are checked against the stored text.
+
+update() walks a tree and only re-extracts files that are new or whose size or mtime
+changed. Files that disappeared are dropped. Files that fail to extract (including
+timeouts) are recorded as failed with their size and mtime, and are only tried again
+once they change or when update() is asked to retry failures. Queries never open the
+files themselves.
+
+The index defaults to ~/.wordsearch_index.sqlite (override with WORDSEARCH_INDEX).
+"""
+import os
+import re
+import sqlite3
+from pathlib import Path
+
+INDEX_PATH = os.getenv("WORDSEARCH_INDEX", str(Path.home() / ".wordsearch_index.sqlite"))
+COMMIT_EVERY = 50      # files extracted between commits, so an interrupted crawl keeps its work
+SNIPPET_CHARS = 40     # context shown on each side of a hit
+
+_WHITESPACE = re.compile(r"\s+")
+
+
+def _fts_query(terms) -> str:
+    """FTS5 expression requiring every term as a quoted substring."""
+    return " AND ".join('"' + term.replace('"', '""') + '"' for term in terms)
+
+
+def _snippet(text: str, lowered: str, term: str) -> str:
+    start = lowered.find(term)
+    if start < 0:
+        return ""
+    lo, hi = max(0, start - SNIPPET_CHARS), start + len(term) + SNIPPET_CHARS
+    body = _WHITESPACE.sub(" ", text[lo:hi]).strip()
+    return ("..." if lo else "") + body + ("..." if hi < len(text) else "")
+
+
+class SearchIndex:
+    """Path -> extracted text, with size/mtime bookkeeping for incremental updates."""
+
+    def __init__(self, path: str = INDEX_PATH):
+        self.path = path
+        self._conn = sqlite3.connect(path)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.executescript(
+            """
+            CREATE TABLE IF NOT EXISTS files (
+                id    INTEGER PRIMARY KEY,
+                path  TEXT UNIQUE NOT NULL,
+                mtime REAL NOT NULL,
+                size  INTEGER NOT NULL,
+                failed INTEGER NOT NULL DEFAULT 0
+            );
+            CREATE VIRTUAL TABLE IF NOT EXISTS content USING fts5(text, tokenize='trigram');
+            """
+        )
+        columns = {row[1] for row in self._conn.execute("PRAGMA table_info(files)")}
+        if "failed" not in columns:  # index created before failures were recorded
+            self._conn.execute("ALTER TABLE files ADD COLUMN failed INTEGER NOT NULL DEFAULT 0")
+        self._conn.commit()
+
+    def close(self):
+        self._conn.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    @staticmethod
+    def _under(root: str):
+        """SQL range bounds selecting paths inside `root`."""
+        prefix = os.path.join(os.path.abspath(root), "")
+        return prefix, prefix[:-1] + chr(ord(prefix[-1]) + 1)
+
+    def _forget(self, file_id):
+        self._conn.execute("DELETE FROM files WHERE id = ?", (file_id,))
+        self._conn.execute("DELETE FROM content WHERE rowid = ?", (file_id,))
+
+    def _store(self, file_id, path: str, stat, text):
+        """Record a file's text, or text=None for a failed extraction (no content row)."""
+        failed = int(text is None)
+        if file_id is None:
+            file_id = self._conn.execute(
+                "INSERT INTO files (path, mtime, size, failed) VALUES (?, ?, ?, ?)",
+                (path, stat.st_mtime, stat.st_size, failed),
+            ).lastrowid
+        else:
+            self._conn.execute(
+                "UPDATE files SET mtime = ?, size = ?, failed = ? WHERE id = ?",
+                (stat.st_mtime, stat.st_size, failed, file_id),
+            )
+            self._conn.execute("DELETE FROM content WHERE rowid = ?", (file_id,))
+        if text is not None:
+            self._conn.execute("INSERT INTO content (rowid, text) VALUES (?, ?)", (file_id, text))
+
+    def update(self, root: str, extract, extensions, extract_many=None, retry_failed: bool = False) -> dict:
+        """
+        Bring the index up to date for every file under `root` with one of `extensions`.
+        extract(path) returns the file's text; extract_many(paths), if given, replaces it
+        with an iterator of (path, text, error) in any order (e.g. a process pool).
+        Files that fail to extract are recorded without text and skipped by later updates
+        until they change, unless retry_failed is set.
+        Returns counts of added/updated/removed/unchanged/failed, plus skipped_failed for
+        earlier failures that were not retried.
+        """
+        low, high = self._under(root)
+        known = {
+            path: (file_id, mtime, size, failed)
+            for file_id, path, mtime, size, failed in self._conn.execute(
+                "SELECT id, path, mtime, size, failed FROM files WHERE path >= ? AND path < ?", (low, high)
+            )
+        }
+        stats = dict(added=0, updated=0, removed=0, unchanged=0, failed=0, skipped_failed=0)
+        seen = set()
+        stale = {}  # path -> (stat, index entry or None)
+
+        for dirpath, _, files in os.walk(os.path.abspath(root)):
+            for fname in files:
+                if os.path.splitext(fname)[1].lower() not in extensions:
+                    continue
+                path = os.path.join(dirpath, fname)
+                try:
+                    stat = os.stat(path)
+                except OSError:
+                    continue
+                seen.add(path)
+                entry = known.get(path)
+                if entry is None or entry[1] != stat.st_mtime or entry[2] != stat.st_size:
+                    stale[path] = (stat, entry)
+                elif not entry[3]:
+                    stats["unchanged"] += 1
+                elif retry_failed:
+                    stale[path] = (stat, entry)
+                else:
+                    stats["skipped_failed"] += 1
+
+        def extract_each(paths):
+            for path in paths:
+                try:
+                    yield path, extract(path), None
+                except Exception as exc:
+                    yield path, None, exc
+
+        extracted = (extract_many or extract_each)(list(stale))
+        for count, (path, text, error) in enumerate(extracted, start=1):
+            stat, entry = stale[path]
+            if error is not None:
+                print(f"Warning: failed to read {path!r}: {error}")
+                stats["failed"] += 1
+                text = None
+            else:
+                stats["updated" if entry else "added"] += 1
+            self._store(entry[0] if entry else None, path, stat, text)
+            if count % COMMIT_EVERY == 0:
+                self._conn.commit()
+
+        for path in known.keys() - seen:
+            self._forget(known[path][0])
+            stats["removed"] += 1
+        self._conn.commit()
+        return stats
+
+    def search(self, root: str, terms):
+        """
+        Yield (path, snippets) for indexed files under `root` containing every term
+        (case-insensitive). snippets holds one excerpt per term.
+        """
+        terms = [term.lower() for term in terms if term]
+        low, high = self._under(root)
+        sql = ("SELECT f.path, c.text FROM content c JOIN files f ON f.id = c.rowid "
+               "WHERE f.path >= ? AND f.path < ?")
+        params = [low, high]
+        # Trigrams need 3+ characters; shorter terms are only checked below
+        indexed = [term for term in terms if len(term) >= 3]
+        if indexed:
+            sql += " AND content MATCH ?"
+            params.append(_fts_query(indexed))
+        sql += " ORDER BY f.path"
+
+        for path, text in self._conn.execute(sql, params):
+            lowered = text.lower()
+            if all(term in lowered for term in terms):
+                yield path, [_snippet(text, lowered, term) for term in terms]
@@ -7,60 +7,178 @@ Run the script, then:
   2. Enter a comma-separated list of words/phrases (case-insensitive).
 
 Every result shown contains all of the supplied terms.
+
+Searches go through an on-disk full-text index (search_index.py): the first search of a
+tree extracts every file once, later searches only re-extract files that changed and are
+answered from the index. Options:
+  --no-index     scan and extract every file, as before
+  --no-update    answer from the index without checking the tree for changes
+  --index PATH   index file (default ~/.wordsearch_index.sqlite or WORDSEARCH_INDEX)
+  --workers N    extraction processes (default: all cores; 1 = in this process)
+  --timeout S    skip a file whose extraction takes longer than S seconds (default 60)
+  --retry-failed re-extract files that failed or timed out before (otherwise they are
+                 only retried once they change)
 """
 
+import argparse
 import os
+from functools import partial
 from typing import List
 from docx import Document
 from openpyxl import load_workbook
-from PyPDF2 import PdfReader
 import xlrd  # For .xls files
 
+from parallel_extract import imap_unordered
+from pdf_text import iter_pages
+from search_index import INDEX_PATH, SearchIndex
 
-def file_contains_terms(path: str, terms: List[str]) -> bool:
-    """Return True iff all terms occur (case-insensitive) in the file text."""
-    ext = os.path.splitext(path)[1].lower()
-    text = ""
+SUPPORTED_EXTENSIONS = (".txt", ".docx", ".xlsx", ".xls", ".pdf")
 
-    try:
-        if ext == ".txt":
-            with open(path, "r", encoding="utf-8", errors="ignore") as f:
-                text = f.read()
 
-        elif ext == ".docx":
-            doc = Document(path)
-            text = "\n".join(p.text for p in doc.paragraphs)
+TXT_BLOCK = 1 << 20      # characters per chunk when streaming .txt files
+ROWS_PER_CHUNK = 1000    # spreadsheet rows per chunk (per-row chunks cost more than they save)
 
-        elif ext == ".xlsx":
-            wb = load_workbook(path, read_only=True, data_only=True)
+
+def _row_chunks(rows):
+    """Join spreadsheet rows ("cell cell ") into chunks of ROWS_PER_CHUNK rows."""
+    batch = []
+    for row in rows:
+        batch.append("".join(f"{cell} " for cell in row if cell is not None))
+        if len(batch) == ROWS_PER_CHUNK:
+            yield "".join(batch)
+            batch = []
+    if batch:
+        yield "".join(batch)
+
+
+def iter_text_chunks(path: str):
+    """
+    Yield the text of a supported file piece by piece (blocks, paragraphs, rows, pages).
+    Joined together the pieces are exactly the file's full text, so a reader can stop
+    as soon as it has seen enough. Raises on unreadable files.
+    """
+    ext = os.path.splitext(path)[1].lower()
+
+    if ext == ".txt":
+        with open(path, "r", encoding="utf-8", errors="ignore") as f:
+            while True:
+                block = f.read(TXT_BLOCK)
+                if not block:
+                    break
+                yield block
+
+    elif ext == ".docx":
+        doc = Document(path)
+        for i, p in enumerate(doc.paragraphs):
+            yield p.text if i == 0 else "\n" + p.text
+
+    elif ext == ".xlsx":
+        wb = load_workbook(path, read_only=True, data_only=True)
+        try:
             for sheet in wb.worksheets:
-                for row in sheet.iter_rows(values_only=True):
-                    for cell in row:
-                        if cell is not None:
-                            text += f"{cell} "
-
-        elif ext == ".xls":
-            book = xlrd.open_workbook(path)
-            for sheet in book.sheets():
-                for row_idx in range(sheet.nrows):
-                    for col_idx in range(sheet.ncols):
-                        val = sheet.cell_value(row_idx, col_idx)
-                        text += f"{val} "
-
-        elif ext == ".pdf":
-            reader = PdfReader(path)
-            for page in reader.pages:
-                text += page.extract_text() or ""
-
-        else:
-            return False  # Unsupported extension
+                yield from _row_chunks(sheet.iter_rows(values_only=True))
+        finally:
+            wb.close()
+
+    elif ext == ".xls":
+        # on_demand loads one sheet at a time, so an early stop skips the rest
+        book = xlrd.open_workbook(path, on_demand=True)
+        try:
+            for sheet_idx in range(book.nsheets):
+                sheet = book.sheet_by_index(sheet_idx)
+                yield from _row_chunks(sheet.row_values(row_idx) for row_idx in range(sheet.nrows))
+                book.unload_sheet(sheet_idx)
+        finally:
+            book.release_resources()
+
+    elif ext == ".pdf":
+        # Pages come from the shared text cache; only uncached pages are parsed
+        yield from iter_pages(path, engine="pypdf2")
+
+    else:
+        raise ValueError(f"unsupported file type {ext!r}")
+
+
+def extract_text(path: str) -> str:
+    """Return the full text of a supported file. Raises on unreadable files."""
+    return "".join(iter_text_chunks(path))
+
+
+class TermScanner:
+    """
+    Tracks which terms have appeared in a stream of text chunks.
+    Each outstanding term is searched with str's C substring search, so only terms
+    not yet seen cost anything, and the last len(longest term) - 1 characters are
+    carried over so matches spanning two chunks are still found.
+    """
 
+    def __init__(self, terms: List[str]):
+        self.pending = set(terms)
+        self._overlap = max((len(t) for t in self.pending), default=1) - 1
+        self._tail = ""
+
+    @property
+    def done(self) -> bool:
+        return not self.pending
+
+    def feed(self, chunk: str) -> bool:
+        """Scan the next chunk; returns True once every term has been seen."""
+        if self.pending and chunk:
+            text = self._tail + chunk.lower()
+            self.pending = {term for term in self.pending if term not in text}
+            self._tail = text[-self._overlap:] if self._overlap else ""
+        return not self.pending
+
+
+def file_contains_terms(path: str, terms: List[str]) -> bool:
+    """
+    Return True iff all terms occur (case-insensitive) in the file text.
+    Stops reading as soon as the last term has been seen.
+    """
+    if os.path.splitext(path)[1].lower() not in SUPPORTED_EXTENSIONS:
+        return False  # Unsupported extension
+
+    scanner = TermScanner(terms)
+    if scanner.done:
+        return True
+    chunks = iter_text_chunks(path)
+    try:
+        for chunk in chunks:
+            if scanner.feed(chunk):
+                return True
     except Exception as exc:
         print(f"Warning: failed to read {path!r}: {exc}")
         return False
+    finally:
+        chunks.close()
+    return False
 
-    text = text.lower()
-    return all(term in text for term in terms)
+
+def iter_supported_files(directory: str):
+    for root, _, files in os.walk(directory):
+        for fname in files:
+            if os.path.splitext(fname)[1].lower() in SUPPORTED_EXTENSIONS:
+                yield os.path.join(root, fname)
+
+
+def scan_tree(directory: str, terms: List[str], workers: int = 1, timeout: float = 60.0):
+    """
+    Extract every supported file under directory and yield those containing all terms,
+    as they are found. With workers > 1 files are handled by a process pool, and files
+    taking longer than `timeout` seconds are skipped.
+    """
+    if workers <= 1:
+        for fullpath in iter_supported_files(directory):
+            if file_contains_terms(fullpath, terms):
+                yield fullpath
+        return
+
+    check = partial(file_contains_terms, terms=terms)
+    for fullpath, matched, error in imap_unordered(check, iter_supported_files(directory), workers, timeout):
+        if error is not None:
+            print(f"Warning: skipped {fullpath!r}: {error}")
+        elif matched:
+            yield fullpath
 
 
 def prompt_directory() -> str:
@@ -80,24 +198,57 @@ def prompt_terms() -> List[str]:
         print("You must enter at least one term.\n")
 
 
+def print_matches(matches) -> int:
+    """Print matching paths as they arrive; returns how many there were."""
+    found = 0
+    for m in matches:
+        if not found:
+            print("\nFiles containing all terms:")
+        found += 1
+        print(m, flush=True)
+    return found
+
+
 def main():
+    parser = argparse.ArgumentParser(description="Search documents under a directory for words or phrases.")
+    parser.add_argument("--no-index", action="store_true", help="Scan every file instead of using the index")
+    parser.add_argument("--no-update", action="store_true", help="Query the index without checking for changed files")
+    parser.add_argument("--index", default=INDEX_PATH, help="Index file to use")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1, help="Extraction processes")
+    parser.add_argument("--timeout", type=float, default=60.0, help="Per-file extraction timeout in seconds")
+    parser.add_argument("--retry-failed", action="store_true",
+                        help="Re-extract indexed files that failed or timed out on an earlier run")
+    args = parser.parse_args()
+
     directory = prompt_directory()
     terms = prompt_terms()
 
-    matches: List[str] = []
-    for root, _, files in os.walk(directory):
-        for fname in files:
-            if os.path.splitext(fname)[1].lower() in (".txt", ".docx", ".xlsx", ".xls", ".pdf"):
-                fullpath = os.path.join(root, fname)
-                if file_contains_terms(fullpath, terms):
-                    matches.append(fullpath)
-
-    if matches:
-        print("\nFiles containing all terms:")
-        for m in matches:
-            print(m)
-    else:
-        print("No files found containing all of those terms.")
+    if args.no_index:
+        if not print_matches(scan_tree(directory, terms, args.workers, args.timeout)):
+            print("No files found containing all of those terms.")
+        return
+
+    with SearchIndex(args.index) as index:
+        if not args.no_update:
+            print("Updating index (only new or changed files are read)...")
+            extract_many = None
+            if args.workers > 1:
+                extract_many = partial(imap_unordered, extract_text, workers=args.workers, timeout=args.timeout)
+            stats = index.update(directory, extract_text, SUPPORTED_EXTENSIONS, extract_many, args.retry_failed)
+            print("  {added} added, {updated} updated, {removed} removed, {unchanged} unchanged, {failed} failed".format(**stats))
+            if stats["skipped_failed"]:
+                print(f"  {stats['skipped_failed']} files that failed before were skipped (use --retry-failed)")
+
+        found = 0
+        for path, snippets in index.search(directory, terms):
+            if not found:
+                print("\nFiles containing all terms:")
+            found += 1
+            print(path)
+            for term, snippet in zip(terms, snippets):
+                print(f"    [{term}] {snippet}")
+        if not found:
+            print("No files found containing all of those terms.")
 
 
 if __name__ == "__main__":
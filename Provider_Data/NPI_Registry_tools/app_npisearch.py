@@ -1,137 +1,149 @@
-import requests
 import tkinter as tk
 from tkinter import ttk
 from tkinter import messagebox
-import openpyxl
 from tkinter import filedialog
 from tksheet import Sheet
 
+from npi_background import BackgroundLookup, parse_npi_text, read_npis_from_file
+from npi_cache import NPICache
+from npi_client import NPIClient
+from npi_export import write_rows_xlsx
+from npi_records import normalize
+from npi_validate import format_invalid, validate_npis
+from nucc_taxonomy import describe, missing_table_message, table_missing
+from results_view import ResultsModel, VirtualTreeview
+
+# One pooled, rate-limited client for the whole session
+client = NPIClient(cache=NPICache(stale_while_revalidate=True))
+
+# How often the Tk loop picks up finished lookups (milliseconds)
+POLL_MS = 100
+# Most lookups moved into the table per poll; the virtualized table makes large batches cheap
+DRAIN_LIMIT = 5000
+current_lookup = None
+lookup_errors = []
+
+def na(value):
+    """Show blanks as N/A in the table."""
+    return value if value else "N/A"
+
+def result_row(record):
+    """Table row for one NPIRecord, matching the `columns` layout."""
+    if not record.found:
+        return [record.npi] + ["N/A"] * (len(columns) - 1)
+
+    if record.npi_type == "NPI-2":
+        # Organizations: name in Last Name, DBA in First Name
+        last_name, first_name = record.organization_name, record.dba_name
+    else:
+        last_name, first_name = record.last_name, record.first_name
+
+    # Taxonomy1 = first primary, Taxonomy2/3 = first two non-primary
+    primary, others = record.primary_taxonomies, record.other_taxonomies
+    picked = [primary[0] if primary else None] + [others[i] if len(others) > i else None for i in range(2)]
+    taxonomy_cells = []
+    for taxonomy in picked:
+        taxonomy_cells += [na(taxonomy[0]), na(describe(taxonomy[0]))] if taxonomy else ["N/A", "N/A"]
+
+    return [
+        record.npi,
+        na(last_name),
+        na(first_name),
+        na(record.sex),
+        na(record.npi_type),
+        na(record.address),
+        na(record.city),
+        na(record.state),
+        na(record.zip5),
+        na(record.phone.replace("-", "")),
+        na(record.fax.replace("-", "")),
+    ] + taxonomy_cells
+
 def fetch_npi_data():
+    global current_lookup, lookup_errors
     # Get all entered NPI numbers
-    npi_numbers = [entry.get().strip() for entry in npi_entries if entry.get().strip()]
+    # Malformed NPIs and bad check digits are dropped before any request goes out
+    npi_numbers, invalid = validate_npis(parse_npi_text(npi_input.get("1.0", tk.END)))
+    if invalid:
+        messagebox.showwarning("Invalid NPIs", f"{len(invalid)} entries skipped:\n{format_invalid(invalid, limit=10)}")
     if not npi_numbers:
-        messagebox.showwarning("Input Error", "Please enter at least one NPI number.")
+        messagebox.showwarning("Input Error", "Please enter at least one valid NPI number.")
         return
 
-    results = []
-    for npi in npi_numbers:
-        try:
-            response = requests.get(f"https://npiregistry.cms.hhs.gov/api/?number={npi}&version=2.1")
-            response.raise_for_status()  # Raise an HTTPError if the HTTP request returned an unsuccessful status code
-            data = response.json()
-        except Exception as e:
-            messagebox.showerror("Network/API Error", f"An error occurred for NPI {npi}: {e}")
-            continue
+    # Clear existing results
+    results.clear()
+    results_view.reset()
+    provider_sheet.set_sheet_data([])
+    update_record_count()
 
-        if data.get("results"):
-            result = data["results"][0]
-            npi_type = result.get("enumeration_type", "N/A")
-
-            # Default placeholders
-            last_name = "N/A"
-            first_name = "N/A"
-            provider_gender = "N/A"
-            
-            if npi_type == "NPI-1":  
-                # For Individuals
-                last_name = result["basic"].get("last_name", "N/A")
-                first_name = result["basic"].get("first_name", "N/A")
-                provider_gender = result["basic"].get("sex", "N/A")
-            elif npi_type == "NPI-2":
-                # For Organizations
-                org_name = result["basic"].get("organization_name", "N/A")
-                last_name = org_name
-
-                dba = result["basic"].get("dba_name", "").strip()
-                first_name = dba if dba else "N/A"
-
-            # Primary address info
-            primary_address = result.get("addresses", [{}])[0]
-            address = primary_address.get("address_1", "N/A")
-            city = primary_address.get("city", "N/A")
-            state = primary_address.get("state", "N/A")
-            zip_code = primary_address.get("postal_code", "N/A").split('-')[0]
-            phone = primary_address.get("telephone_number", "N/A").replace("-", "")
-            fax = primary_address.get("fax_number", "N/A").replace("-", "")
-
-            # TAXONOMIES (Updated logic)
-            all_taxonomies = result.get("taxonomies", [])
-
-            # Separate into primary vs. non-primary
-            primary_list = [t for t in all_taxonomies if t.get("primary") == True]
-            non_primary_list = [t for t in all_taxonomies if not t.get("primary")]
-
-            # 1) Taxonomy1 Code/Desc (use first primary if exists)
-            if len(primary_list) > 0:
-                taxonomy1_code = primary_list[0].get("code", "N/A")
-                taxonomy1_desc = primary_list[0].get("desc", "N/A")
-            else:
-                taxonomy1_code = "N/A"
-                taxonomy1_desc = "N/A"
-
-            # 2) Taxonomy2 Code/Desc -> first non-primary
-            if len(non_primary_list) > 0:
-                taxonomy2_code = non_primary_list[0].get("code", "N/A")
-                taxonomy2_desc = non_primary_list[0].get("desc", "N/A")
-            else:
-                taxonomy2_code = "N/A"
-                taxonomy2_desc = "N/A"
-
-            # 3) Taxonomy3 Code/Desc -> second non-primary
-            if len(non_primary_list) > 1:
-                taxonomy3_code = non_primary_list[1].get("code", "N/A")
-                taxonomy3_desc = non_primary_list[1].get("desc", "N/A")
-            else:
-                taxonomy3_code = "N/A"
-                taxonomy3_desc = "N/A"
-
-            # Build a row with the desired columns
-            row = [
-                npi,
-                last_name,
-                first_name,
-                provider_gender,
-                npi_type,
-                address,
-                city,
-                state,
-                zip_code,
-                phone,
-                fax,
-                taxonomy1_code,
-                taxonomy1_desc,
-                taxonomy2_code,
-                taxonomy2_desc,
-                taxonomy3_code,
-                taxonomy3_desc
-            ]
-            results.append(row)
-        else:
-            # No results found
-            row = [
-                npi, "N/A", "N/A", "N/A", "N/A", 
-                "N/A", "N/A", "N/A", "N/A", "N/A", 
-                "N/A", "N/A", "N/A", "N/A", "N/A",
-                "N/A", "N/A"
-            ]
-            results.append(row)
-
-    # Clear existing table entries
-    for row_id in table.get_children():
-        table.delete(row_id)
-
-    # Insert new results into the table
-    for result_row in results:
-        table.insert("", "end", values=result_row)
+    # Run the lookups on a worker thread; poll_lookup() streams results into the table
+    lookup_errors = []
+    current_lookup = BackgroundLookup(client, npi_numbers)
+    progress.config(maximum=len(npi_numbers), value=0)
+    progress_label.config(text=f"0 / {len(npi_numbers)}")
+    submit_button.config(state="disabled")
+    cancel_button.config(state="normal")
+    app.after(POLL_MS, poll_lookup, current_lookup)
+
+def poll_lookup(lookup):
+    """Move finished lookups from the worker into the table, then reschedule until the batch ends."""
+    global current_lookup
+    if lookup is not current_lookup:
+        return  # cleared or superseded by a newer batch
+    finished = lookup.drain(DRAIN_LIMIT)
+    rows = []
+    for npi, result, error in finished:
+        if error is not None:
+            lookup_errors.append(f"{npi}: {error}")
+            continue
+        rows.append(result_row(normalize(npi, result)))
+
+    if finished:
+        # One model update and one redraw of each widget per batch
+        results.extend(rows)
+        results_view.refresh()
+        update_provider_sheet(rows)
+        progress.step(len(finished))
+        progress_label.config(text=f"{int(progress['value'])} / {lookup.total}")
+        update_record_count()
+
+    if not lookup.finished:
+        app.after(POLL_MS, poll_lookup, lookup)
+        return
 
-    update_record_count()
-    # Update tksheet with new data
-    update_provider_sheet()
+    current_lookup = None
+    submit_button.config(state="normal")
+    cancel_button.config(state="disabled")
+    if lookup.cancelled:
+        progress_label.config(text=f"Cancelled at {int(progress['value'])} / {lookup.total}")
+    if lookup_errors:
+        shown = "\n".join(lookup_errors[:10])
+        more = f"\n...and {len(lookup_errors) - 10} more" if len(lookup_errors) > 10 else ""
+        messagebox.showerror("Network/API Error", f"{len(lookup_errors)} lookup(s) failed:\n{shown}{more}")
+
+def cancel_fetch():
+    if current_lookup is not None:
+        current_lookup.cancel()
+        cancel_button.config(state="disabled")
+
+def load_npis_from_file():
+    filepath = filedialog.askopenfilename(
+        filetypes=[("NPI lists", "*.xlsx *.xlsm *.csv *.txt"), ("All files", "*.*")],
+    )
+    if not filepath:
+        return
+    try:
+        npis = read_npis_from_file(filepath)
+    except Exception as e:
+        messagebox.showerror("File Error", f"Could not read {filepath}: {e}")
+        return
+    npi_input.delete("1.0", tk.END)
+    npi_input.insert("1.0", "\n".join(npis))
 
 def display_details(event):
-    selected_item = table.selection()
-    if selected_item:
-        record = table.item(selected_item, "values")
+    index = results_view.selected_index()
+    if index is not None:
+        record = results[index]
         details_text.config(state="normal")
         details_text.delete("1.0", tk.END)
         details_text.insert(
@@ -144,10 +156,18 @@ def display_details(event):
         details_text.config(state="disabled")
 
 def clear_entries():
-    for entry in npi_entries:
-        entry.delete(0, tk.END)
-    for row_id in table.get_children():
-        table.delete(row_id)
+    global current_lookup
+    # Stop any running batch; its remaining results are discarded
+    if current_lookup is not None:
+        current_lookup.cancel()
+        current_lookup = None
+        submit_button.config(state="normal")
+        cancel_button.config(state="disabled")
+    progress.config(value=0)
+    progress_label.config(text="")
+    npi_input.delete("1.0", tk.END)
+    results.clear()
+    results_view.reset()
     details_text.config(state="normal")
     details_text.delete("1.0", tk.END)
     details_text.config(state="disabled")
@@ -158,7 +178,7 @@ def clear_entries():
     update_record_count()
 
 def update_record_count():
-    count = len(table.get_children())
+    count = len(results)
     record_count_label.config(text=f"Record count: {count}")
 
 def save_results_to_excel():
@@ -169,33 +189,19 @@ def save_results_to_excel():
     if not filepath:
         return
     
-    wb = openpyxl.Workbook()
-    ws = wb.active
-    ws.title = "NPI Results"
-    ws.append([col for col in columns])
-    
-    for row_id in table.get_children():
-        row_data = table.item(row_id, "values")
-        ws.append(row_data)
-    
-    wb.save(filepath)
+    # Streamed through a write-only workbook straight from the results model
+    write_rows_xlsx(filepath, columns, results.rows, sheet_name="NPI Results")
     messagebox.showinfo("Success", "Results saved successfully!")
 
-def update_provider_sheet():
+def update_provider_sheet(rows):
     """
-    Grabs the Last Name, First Name, and NPI from each row in the Treeview
-    and populates the Tksheet with that data.
+    Appends the Last Name, First Name, and NPI of a batch of new result rows
+    to the Tksheet (which only draws the cells on screen).
     """
-    sheet_data = []
-    for row_id in table.get_children():
-        row_values = table.item(row_id, "values")
-        # row_values[0] = NPI
-        # row_values[1] = Last Name
-        # row_values[2] = First Name
-        # So columns in tksheet will be: [LastName, FirstName, NPI]
-        sheet_data.append([row_values[1], row_values[2], row_values[0]])
-    
-    provider_sheet.set_sheet_data(sheet_data)
+    # row[0] = NPI, row[1] = Last Name, row[2] = First Name
+    # So columns in tksheet will be: [LastName, FirstName, NPI]
+    if rows:
+        provider_sheet.insert_rows([[row[1], row[2], row[0]] for row in rows], undo=False)
 
 # --------------------------------------------------------------------------------
 # GUI Setup
@@ -208,19 +214,32 @@ app.configure(bg="#000000")
 left_frame = tk.Frame(app, bg="#000000")
 left_frame.grid(row=0, column=0, padx=10, pady=10, sticky="n")
 
-instructions = tk.Label(left_frame, text="NPI Search:", bg="#000000", fg="white", font=("Helvetica", 10, "bold"))
+instructions = tk.Label(left_frame, text="NPI Search (paste one per line):", bg="#000000", fg="white", font=("Helvetica", 10, "bold"))
 instructions.pack()
 
-# Create entry boxes for up to 15 NPI numbers
-npi_entries = []
-for i in range(15):
-    entry = tk.Entry(left_frame, width=20, bg="#404040", fg="white")
-    entry.pack(pady=2)
-    npi_entries.append(entry)
+# Paste any number of NPIs, or load them from a file
+input_frame = tk.Frame(left_frame, bg="#000000")
+input_frame.pack(pady=2)
+npi_input = tk.Text(input_frame, width=20, height=20, bg="#404040", fg="white", insertbackground="white")
+input_scrollbar = ttk.Scrollbar(input_frame, orient="vertical", command=npi_input.yview)
+npi_input.config(yscrollcommand=input_scrollbar.set)
+npi_input.pack(side="left")
+input_scrollbar.pack(side="right", fill="y")
+
+load_button = tk.Button(left_frame, text="Load from File", command=load_npis_from_file, bg="#000000", fg="white", font=("Helvetica", 9, "bold"))
+load_button.pack(pady=5)
 
 submit_button = tk.Button(left_frame, text="Fetch NPI Data", command=fetch_npi_data, bg="#000000", fg="white", font=("Helvetica", 9, "bold"))
 submit_button.pack(pady=10)
 
+cancel_button = tk.Button(left_frame, text="Cancel", command=cancel_fetch, state="disabled", bg="#000000", fg="white", font=("Helvetica", 9, "bold"))
+cancel_button.pack(pady=5)
+
+progress = ttk.Progressbar(left_frame, orient="horizontal", length=150, mode="determinate")
+progress.pack(pady=5)
+progress_label = tk.Label(left_frame, text="", bg="#000000", fg="white", font=("Helvetica", 9))
+progress_label.pack()
+
 clear_button = tk.Button(left_frame, text="Clear Entries", command=clear_entries, bg="#000000", fg="white", font=("Helvetica", 9, "bold"))
 clear_button.pack(pady=10)
 
@@ -260,6 +279,7 @@ table_frame = tk.Frame(right_frame, bg="#000000")
 table_frame.pack(fill="both", expand=True)
 
 h_scrollbar = ttk.Scrollbar(table_frame, orient="horizontal")
+v_scrollbar = ttk.Scrollbar(table_frame, orient="vertical")
 table = ttk.Treeview(
     table_frame,
     columns=columns,
@@ -275,9 +295,14 @@ for col in columns:
 
 h_scrollbar.config(command=table.xview)
 h_scrollbar.pack(side="bottom", fill="x")
+v_scrollbar.pack(side="right", fill="y")
 table.pack(side="top", fill="both", expand=True)
 table.bind("<<TreeviewSelect>>", display_details)
 
+# Every fetched row lives in `results`; the Treeview only holds the rows on screen
+results = ResultsModel()
+results_view = VirtualTreeview(table, results, v_scrollbar)
+
 text_boxes_frame = tk.Frame(right_frame, bg="#000000")
 text_boxes_frame.pack(fill="x", expand=True)
 
@@ -324,4 +349,8 @@ record_count_label = tk.Label(
 )
 record_count_label.pack(fill="x", padx=10, pady=5)
 
+# Without the NUCC CSV most taxonomy descriptions would just show N/A; say why up front
+if table_missing():
+    app.after(0, lambda: messagebox.showwarning("Taxonomy table missing", missing_table_message()))
+
 app.mainloop()
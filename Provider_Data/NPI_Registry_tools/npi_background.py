@@ -0,0 +1,91 @@
+#!/usr/bin/env python3
+"""
+Background NPI lookups for the Tk GUIs.
+
+BackgroundLookup runs client.lookup_many() on a worker thread and hands finished
+lookups to the GUI through a queue. The Tk main thread polls it with app.after(),
+so the window stays responsive while hundreds of lookups run, and cancel() stops
+the batch without waiting for the queued lookups.
+
+Also holds the input helpers that replace the fixed 15 entry boxes: paste a list,
+or load NPIs from a text, CSV or Excel file.
+"""
+import csv
+import queue
+import re
+import threading
+from pathlib import Path
+
+# NPIs can be pasted one per line, or separated by commas, semicolons or whitespace
+_SEPARATORS = re.compile(r"[\s,;]+")
+
+
+def parse_npi_text(text: str) -> list:
+    """NPIs from pasted text, in order, without duplicates."""
+    return list(dict.fromkeys(token for token in _SEPARATORS.split(text) if token))
+
+
+def read_npis_from_file(path: str) -> list:
+    """
+    NPIs from a file: the first column of the active sheet for .xlsx/.xlsm,
+    the first column for .csv, and every token for anything else.
+    """
+    suffix = Path(path).suffix.lower()
+    if suffix in (".xlsx", ".xlsm"):
+        from npi_cache import read_npi_column
+        values = [str(v).strip() for v in read_npi_column(path, "A")]
+    elif suffix == ".csv":
+        with open(path, "r", encoding="utf-8", errors="ignore", newline="") as f:
+            values = [row[0].strip() for row in csv.reader(f) if row and row[0].strip()]
+    else:
+        with open(path, "r", encoding="utf-8", errors="ignore") as f:
+            values = _SEPARATORS.split(f.read())
+    return list(dict.fromkeys(v for v in values if v))
+
+
+class BackgroundLookup:
+    """Runs a batch of lookups on a worker thread; the GUI drains results as they finish."""
+
+    def __init__(self, client, npis: list):
+        self.client = client
+        self.npis = list(npis)
+        self.total = len(self.npis)
+        self._results = queue.Queue()
+        self._cancelled = threading.Event()
+        self._done = threading.Event()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+
+    def _run(self):
+        lookups = self.client.lookup_many(self.npis, ordered=False)
+        try:
+            for item in lookups:
+                if self._cancelled.is_set():
+                    break
+                self._results.put(item)
+        finally:
+            lookups.close()
+            self._done.set()
+
+    def cancel(self):
+        """Stop after the lookups already in flight; queued ones are dropped."""
+        self._cancelled.set()
+
+    @property
+    def cancelled(self) -> bool:
+        return self._cancelled.is_set()
+
+    @property
+    def finished(self) -> bool:
+        """True once the worker has stopped and every result has been drained."""
+        return self._done.is_set() and self._results.empty()
+
+    def drain(self, limit: int = 500) -> list:
+        """Up to `limit` finished (npi, result, error) tuples, without blocking."""
+        items = []
+        while len(items) < limit:
+            try:
+                items.append(self._results.get_nowait())
+            except queue.Empty:
+                break
+        return items
@@ -0,0 +1,182 @@
+#!/usr/bin/env python3
+"""
+Persistent cache of raw NPI Registry results, keyed by NPI.
+
+Results (including "no match") are stored as JSON in a local SQLite file with the time
+they were fetched. Entries younger than the TTL are served without a network call;
+repeat lookups within one process come from a small in-memory LRU in front of SQLite
+(MEMORY_ENTRIES results), so bulk pulls keep a flat memory footprint.
+With stale_while_revalidate=True an expired entry is still returned immediately while
+NPIClient refreshes it in the background.
+
+NPIClient(cache=NPICache()) uses it transparently. To pre-fetch a whole roster:
+    python npi_cache.py warm roster.xlsx [--column A] [--sheet NAME] [--force]
+
+The cache file defaults to ~/.npi_registry_cache.sqlite (override with NPI_CACHE_PATH).
+"""
+import argparse
+import json
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from pathlib import Path
+
+CACHE_PATH = os.getenv("NPI_CACHE_PATH", str(Path.home() / ".npi_registry_cache.sqlite"))
+DEFAULT_TTL = 30 * 24 * 3600  # seconds
+MEMORY_ENTRIES = 1024          # most recently used results kept in memory
+
+
+class NPICache:
+    """SQLite-backed NPI result cache with a TTL and a bounded in-memory LRU in front."""
+
+    def __init__(self, path: str = CACHE_PATH, ttl: float = DEFAULT_TTL, stale_while_revalidate: bool = False,
+                 memory_entries: int = MEMORY_ENTRIES):
+        self.path = str(path)
+        self.ttl = ttl
+        self.stale_while_revalidate = stale_while_revalidate
+        self.memory_entries = memory_entries
+        self._memory = OrderedDict()
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(self.path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS responses (
+                npi        TEXT PRIMARY KEY,
+                body       TEXT,
+                fetched_at REAL NOT NULL
+            )
+            """
+        )
+        self._conn.commit()
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+    def get(self, npi: str):
+        """
+        Return (result, fresh) for a cached NPI, or None if it has never been fetched.
+        result is the registry dict, or None for a cached "no match".
+        """
+        with self._lock:
+            entry = self._memory.get(npi)
+            if entry is not None:
+                self._memory.move_to_end(npi)
+            else:
+                row = self._conn.execute(
+                    "SELECT body, fetched_at FROM responses WHERE npi = ?", (npi,)
+                ).fetchone()
+                if row is None:
+                    return None
+                entry = (json.loads(row[0]) if row[0] is not None else None, row[1])
+                self._remember(npi, entry)
+        result, fetched_at = entry
+        return result, time.time() - fetched_at < self.ttl
+
+    def put(self, npi: str, result):
+        """Store a fetched result (None records that the registry had no match)."""
+        fetched_at = time.time()
+        body = json.dumps(result) if result is not None else None
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO responses (npi, body, fetched_at) VALUES (?, ?, ?)",
+                (npi, body, fetched_at),
+            )
+            self._conn.commit()
+            self._remember(npi, (result, fetched_at))
+
+    def _remember(self, npi: str, entry):
+        """Add to the in-memory LRU, evicting the least recently used results (lock held)."""
+        if self.memory_entries <= 0:
+            return
+        self._memory[npi] = entry
+        self._memory.move_to_end(npi)
+        while len(self._memory) > self.memory_entries:
+            self._memory.popitem(last=False)
+
+    def __len__(self):
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM responses").fetchone()[0]
+
+
+def read_npi_column(file_path: str, column: str = "A", sheet: str = None):
+    """Values from one column of a workbook (blank cells skipped)."""
+    from openpyxl import load_workbook
+    from openpyxl.utils import column_index_from_string
+
+    col_idx = column_index_from_string(column.upper())
+    wb = load_workbook(file_path, read_only=True, data_only=True)
+    try:
+        ws = wb[sheet] if sheet else wb.active
+        ws.reset_dimensions()  # don't trust a stale <dimension> record to bound the rows
+        values = []
+        for row in ws.iter_rows(min_col=col_idx, max_col=col_idx, values_only=True):
+            if row and row[0] is not None and str(row[0]).strip():
+                values.append(row[0])
+        return values
+    finally:
+        wb.close()
+
+
+def warm(file_path: str, column: str = "A", sheet: str = None, force: bool = False,
+         cache_path: str = CACHE_PATH, ttl: float = DEFAULT_TTL):
+    """Pre-fetch every NPI in a workbook column into the cache. Returns (fetched, already_cached, failed)."""
+    from npi_client import NPIClient
+    from npi_validate import validate_npis
+
+    cache = NPICache(cache_path, ttl)
+    npis, invalid = validate_npis(read_npi_column(file_path, column, sheet))
+    if invalid:
+        print(f"Skipping {len(invalid)} invalid entries")
+    todo = []
+    cached = 0
+    for npi in npis:
+        entry = cache.get(npi)
+        if not force and entry is not None and entry[1]:
+            cached += 1
+        else:
+            todo.append(npi)
+
+    fetched = failed = 0
+    # A cache-less client, so --force really goes to the registry
+    with NPIClient() as client:
+        for npi, result, error in client.lookup_many(todo):
+            if error is not None:
+                failed += 1
+                print(f"Lookup failed for NPI {npi}: {error}")
+                continue
+            cache.put(npi, result)
+            fetched += 1
+    cache.close()
+    return fetched, cached, failed
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Manage the local NPI Registry response cache.")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    warm_parser = sub.add_parser("warm", help="Pre-fetch a column of NPIs from an Excel file")
+    warm_parser.add_argument("file_path", help="Excel workbook holding the NPIs")
+    warm_parser.add_argument("--column", default="A", help="Column letter with the NPIs (default: A)")
+    warm_parser.add_argument("--sheet", help="Sheet name (default: the active sheet)")
+    warm_parser.add_argument("--force", action="store_true", help="Re-fetch NPIs that are already cached")
+    warm_parser.add_argument("--ttl-days", type=float, default=DEFAULT_TTL / 86400, help="Freshness window in days")
+
+    sub.add_parser("stats", help="Show how many NPIs are cached")
+
+    args = parser.parse_args()
+    if args.command == "warm":
+        fetched, cached, failed = warm(args.file_path, args.column, args.sheet, args.force,
+                                       ttl=args.ttl_days * 86400)
+        print(f"Fetched {fetched}, already cached {cached}, failed {failed} -> {CACHE_PATH}")
+    elif args.command == "stats":
+        cache = NPICache()
+        print(f"{len(cache)} NPIs cached in {CACHE_PATH}")
+        cache.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,83 @@
+#!/usr/bin/env python3
+"""
+Resumable NPI enrichment runs.
+
+CheckpointedClient wraps NPIClient or NPPESIndex and has the same lookup_many interface.
+Every completed lookup is committed to a small SQLite checkpoint file as it arrives, so
+a run that dies halfway (network blip, laptop sleep, Ctrl+C) keeps its work. On the
+next run the NPIs already in the checkpoint come straight from it and only the rest are
+looked up. Failed lookups are not recorded, so a rerun retries them.
+
+npi_xclpull.py keeps the checkpoint next to its output (<output>.checkpoint.sqlite)
+and deletes it once a run finishes without failures.
+"""
+import json
+import os
+import sqlite3
+
+
+class CheckpointedClient:
+    """Records completed lookups in a checkpoint file and skips them on restart."""
+
+    def __init__(self, client, path: str):
+        self.client = client
+        self.path = path
+        self.resumed = 0   # lookups served from the checkpoint in this run
+        self.failed = 0    # lookups that raised and will be retried next run
+        self._conn = sqlite3.connect(path)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute("CREATE TABLE IF NOT EXISTS done (npi TEXT PRIMARY KEY, body TEXT)")
+        self._conn.commit()
+
+    def __len__(self):
+        return self._conn.execute("SELECT COUNT(*) FROM done").fetchone()[0]
+
+    def close(self, remove_if_complete: bool = False):
+        """Close the checkpoint; optionally delete it when nothing failed in this run."""
+        self._conn.close()
+        if remove_if_complete and not self.failed:
+            for suffix in ("", "-wal", "-shm"):
+                if os.path.exists(self.path + suffix):
+                    os.remove(self.path + suffix)
+
+    def _load(self, npi: str):
+        body = self._conn.execute("SELECT body FROM done WHERE npi = ?", (npi,)).fetchone()[0]
+        return json.loads(body) if body is not None else None
+
+    def results(self, npis):
+        """
+        Yield (npi, result) from the checkpoint alone, for a second pass over a finished
+        run. NPIs it does not hold (failed lookups) come back with result None.
+        """
+        for npi in npis:
+            npi = str(npi).strip()
+            row = self._conn.execute("SELECT body FROM done WHERE npi = ?", (npi,)).fetchone()
+            yield npi, json.loads(row[0]) if row is not None and row[0] is not None else None
+
+    def lookup_many(self, npis, ordered: bool = True):
+        """
+        Yields (npi, result, error) in input order, like NPIClient.lookup_many.
+        NPIs in the checkpoint are not looked up again.
+        """
+        npis = [str(npi).strip() for npi in npis]
+        done = {npi for (npi,) in self._conn.execute("SELECT npi FROM done")}
+        todo = [npi for npi in npis if npi not in done]
+        fresh = self.client.lookup_many(todo)
+        try:
+            for npi in npis:
+                if npi in done:
+                    self.resumed += 1
+                    yield npi, self._load(npi), None
+                    continue
+                # todo keeps input order, so the next fresh result belongs to this NPI
+                npi, result, error = next(fresh)
+                if error is None:
+                    body = json.dumps(result) if result is not None else None
+                    self._conn.execute("INSERT OR REPLACE INTO done (npi, body) VALUES (?, ?)", (npi, body))
+                    self._conn.commit()
+                else:
+                    self.failed += 1
+                yield npi, result, error
+        finally:
+            fresh.close()
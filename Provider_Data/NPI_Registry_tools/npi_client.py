@@ -0,0 +1,210 @@
+#!/usr/bin/env python3
+"""
+Shared NPI Registry client used by npi_xclpull.py, app_npisearch.py and Healthcare/NPIsearch.py.
+
+- One pooled requests.Session, so lookups reuse TCP/TLS connections.
+- Bounded concurrency through a thread pool (max_workers).
+- A token-bucket rate limiter shared by every worker (rate requests/second).
+- Retry with exponential backoff on 429 and 5xx responses and on connection errors,
+  honouring Retry-After when the server sends it.
+
+- Optional persistent result cache (npi_cache.NPICache): fresh entries skip the network,
+  and with stale_while_revalidate expired entries are returned at once and refreshed
+  in the background.
+
+The registry URL can be pointed elsewhere (e.g. a local stub server serving canned JSON)
+with the base_url argument or the NPI_REGISTRY_URL environment variable.
+
+Usage:
+    from npi_client import NPIClient
+    client = NPIClient()
+    result = client.lookup('1234567893')            # first registry result dict, or None
+    for npi, result, error in client.lookup_many(npis):
+        ...
+"""
+import os
+import random
+import threading
+import time
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, as_completed, wait
+
+import requests
+from requests.adapters import HTTPAdapter
+
+REGISTRY_URL = os.getenv("NPI_REGISTRY_URL", "https://npiregistry.cms.hhs.gov/api/")
+API_VERSION = "2.1"
+
+# Status codes worth retrying: rate limited or a server-side failure
+RETRY_STATUSES = frozenset({429, 500, 502, 503, 504})
+
+
+class TokenBucket:
+    """Thread-safe token bucket: allows `rate` acquisitions per second with bursts up to `capacity`."""
+
+    def __init__(self, rate: float, capacity: float = None):
+        self.rate = float(rate)
+        self.capacity = float(capacity if capacity is not None else max(1.0, rate))
+        self._tokens = self.capacity
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self):
+        """Block until a token is available, then take it."""
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+                self._updated = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                wait = (1 - self._tokens) / self.rate
+            time.sleep(wait)
+
+
+class NPIClient:
+    """Pooled, rate-limited, retrying client for the NPI Registry API."""
+
+    def __init__(self, base_url: str = REGISTRY_URL, max_workers: int = 8, rate: float = 10.0,
+                 retries: int = 4, backoff: float = 0.5, timeout: float = 15.0, cache=None):
+        self.base_url = base_url
+        self.cache = cache
+        self.max_workers = max_workers
+        self.retries = retries
+        self.backoff = backoff
+        self.timeout = timeout
+        self.limiter = TokenBucket(rate) if rate else None
+
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=max_workers)
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
+
+        # Background refreshes for stale cache entries
+        self._refresher = None
+        self._refreshing = set()
+        self._refresh_lock = threading.Lock()
+
+    def close(self):
+        if self._refresher is not None:
+            self._refresher.shutdown(wait=True)
+        self.session.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def _sleep_before_retry(self, attempt: int, response=None):
+        retry_after = response.headers.get("Retry-After") if response is not None else None
+        if retry_after and retry_after.isdigit():
+            delay = float(retry_after)
+        else:
+            delay = self.backoff * (2 ** attempt)
+        time.sleep(delay + random.uniform(0, self.backoff))
+
+    def get(self, **params) -> dict:
+        """
+        Call the registry with the given query parameters and return the decoded JSON.
+        Raises requests.RequestException once retries are exhausted.
+        """
+        params.setdefault("version", API_VERSION)
+        for attempt in range(self.retries + 1):
+            if self.limiter:
+                self.limiter.acquire()
+            try:
+                response = self.session.get(self.base_url, params=params, timeout=self.timeout)
+            except (requests.ConnectionError, requests.Timeout):
+                if attempt == self.retries:
+                    raise
+                self._sleep_before_retry(attempt)
+                continue
+            if response.status_code in RETRY_STATUSES and attempt < self.retries:
+                self._sleep_before_retry(attempt, response)
+                continue
+            response.raise_for_status()
+            return response.json()
+
+    def _fetch(self, npi: str) -> dict:
+        data = self.get(number=npi)
+        results = data.get("results")
+        result = results[0] if results else None
+        if self.cache is not None:
+            self.cache.put(npi, result)
+        return result
+
+    def _revalidate(self, npi: str):
+        """Refresh a stale cache entry in the background (once per NPI at a time)."""
+        with self._refresh_lock:
+            if npi in self._refreshing:
+                return
+            self._refreshing.add(npi)
+            if self._refresher is None:
+                self._refresher = ThreadPoolExecutor(max_workers=1)
+
+        def refresh():
+            try:
+                self._fetch(npi)
+            except Exception:
+                pass  # keep serving the stale entry; the next lookup tries again
+            finally:
+                with self._refresh_lock:
+                    self._refreshing.discard(npi)
+
+        self._refresher.submit(refresh)
+
+    def lookup(self, npi) -> dict:
+        """Return the first registry result for an NPI, or None if the registry has no match."""
+        npi = str(npi).strip()
+        if self.cache is not None:
+            entry = self.cache.get(npi)
+            if entry is not None:
+                result, fresh = entry
+                if fresh:
+                    return result
+                if self.cache.stale_while_revalidate:
+                    self._revalidate(npi)
+                    return result
+        return self._fetch(npi)
+
+    def lookup_many(self, npis, ordered: bool = True):
+        """
+        Look up many NPIs concurrently.
+        Yields (npi, result, error) per NPI: result is the registry dict or None,
+        error is the exception raised for that NPI, if any.
+        With ordered=False results are yielded as soon as each lookup finishes.
+        Only a few lookups per worker are in flight at once, so memory stays flat
+        however many NPIs are passed in.
+        """
+        def one(npi):
+            try:
+                return npi, self.lookup(npi), None
+            except Exception as e:
+                return npi, None, e
+
+        window = self.max_workers * 4
+        pool = ThreadPoolExecutor(max_workers=self.max_workers)
+        try:
+            if ordered:
+                pending = deque()
+                for npi in npis:
+                    pending.append(pool.submit(one, npi))
+                    if len(pending) >= window:
+                        yield pending.popleft().result()
+                while pending:
+                    yield pending.popleft().result()
+            else:
+                pending = set()
+                for npi in npis:
+                    pending.add(pool.submit(one, npi))
+                    if len(pending) >= window:
+                        done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                        for future in done:
+                            yield future.result()
+                for future in as_completed(pending):
+                    yield future.result()
+        finally:
+            # Closing the generator early (e.g. a cancelled GUI batch) drops the queued lookups
+            pool.shutdown(wait=True, cancel_futures=True)
@@ -0,0 +1,162 @@
+#!/usr/bin/env python3
+"""
+Bulk crawl of the NPI Registry by search attributes (taxonomy, state, city, postal code).
+
+The registry returns at most 200 results per request and will not skip past 1,000, so a
+single query tops out at 1,200 providers. The crawler pages each query up to that cap.
+When a query fills it, the crawler splits it into narrower queries and crawls those
+instead: postal code prefixes of 2 to 5 digits, then NPI-1 / NPI-2. Queries run
+concurrently through NPIClient, which rate-limits and retries every request. Results are
+deduplicated by NPI and streamed to Parquet in the npi_xclpull.py column layout (all
+columns as strings).
+
+Usage:
+    python npi_crawl.py --taxonomy "Family Medicine" --state CA -o family_medicine_ca.parquet
+    python npi_crawl.py --city "San Diego" --state CA --type NPI-2 -o san_diego_orgs.parquet
+
+Point NPI_REGISTRY_URL at a local mock registry to try it without calling CMS.
+"""
+import argparse
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+
+from npi_client import NPIClient
+from npi_records import MAX_TAXONOMIES, frame_header, normalize, record_row
+
+PAGE_SIZE = 200        # registry maximum for `limit`
+MAX_SKIP = 1000        # registry maximum for `skip`
+FLUSH_ROWS = 5000      # rows per Parquet row group
+
+# The registry will not search on these alone; such queries start out split by postal prefix
+NARROWING_ONLY = frozenset({"state", "enumeration_type"})
+
+
+def split_query(query: dict) -> list:
+    """Narrower queries that together cover `query`, or [] when it cannot be split further."""
+    postal = query.get("postal_code", "").rstrip("*")
+    if len(postal) < 5:
+        prefixes = [f"{n:02d}" for n in range(100)] if not postal else [postal + str(n) for n in range(10)]
+        # Wildcards need at least two characters before the '*'
+        return [dict(query, postal_code=p if len(p) == 5 else p + "*") for p in prefixes]
+    if "enumeration_type" not in query:
+        return [dict(query, enumeration_type=t) for t in ("NPI-1", "NPI-2")]
+    return []
+
+
+def crawl_query(client: NPIClient, query: dict):
+    """Page through one query. Returns (results, capped); capped means the 1,200-result limit was hit."""
+    results = []
+    for skip in range(0, MAX_SKIP + 1, PAGE_SIZE):
+        data = client.get(limit=PAGE_SIZE, skip=skip, **query)
+        if data.get("Errors"):
+            raise ValueError("; ".join(e.get("description", str(e)) for e in data["Errors"]))
+        page = data.get("results") or []
+        results.extend(page)
+        if len(page) < PAGE_SIZE:
+            return results, False
+    return results, True
+
+
+def crawl(client: NPIClient, query: dict, stats: dict = None):
+    """
+    Yield lists of registry results for every provider matching `query`, splitting
+    capped queries as needed. Results can repeat across lists; callers dedupe by NPI.
+    stats (optional) collects counts of queries run, split, failed and truncated.
+    """
+    stats = stats if stats is not None else {}
+    for key in ("queries", "split", "failed", "truncated"):
+        stats.setdefault(key, 0)
+    start = split_query(query) if set(query) <= NARROWING_ONLY else [query]
+
+    pool = ThreadPoolExecutor(max_workers=client.max_workers)
+    try:
+        pending = {pool.submit(crawl_query, client, q): q for q in start}
+        while pending:
+            done, _ = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                q = pending.pop(future)
+                stats["queries"] += 1
+                try:
+                    results, capped = future.result()
+                except Exception as e:
+                    stats["failed"] += 1
+                    print(f"Query failed {q}: {e}")
+                    continue
+                if capped:
+                    children = split_query(q)
+                    if children:
+                        # The narrower queries cover these results again
+                        stats["split"] += 1
+                        for child in children:
+                            pending[pool.submit(crawl_query, client, child)] = child
+                        continue
+                    stats["truncated"] += 1
+                    print(f"Query still capped at {len(results)} results and cannot be split further: {q}")
+                yield results
+    finally:
+        pool.shutdown(wait=True, cancel_futures=True)
+
+
+def write_parquet(batches, output_file: str) -> int:
+    """Normalize and write unique providers from `batches` of registry results. Returns the row count."""
+    # Optional dependency, only needed for Parquet output
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    header = frame_header(MAX_TAXONOMIES)
+    schema = pa.schema([(col, pa.string()) for col in header])
+    seen = set()
+    rows = []
+    written = 0
+
+    with pq.ParquetWriter(output_file, schema) as writer:
+        def flush():
+            writer.write_table(pa.Table.from_pylist([dict(zip(header, row)) for row in rows], schema=schema))
+
+        for results in batches:
+            for result in results:
+                npi = str(result.get("number", ""))
+                if not npi or npi in seen:
+                    continue
+                seen.add(npi)
+                rows.append(record_row(normalize(npi, result), MAX_TAXONOMIES))
+            if len(rows) >= FLUSH_ROWS:
+                flush()
+                written += len(rows)
+                rows = []
+        if rows:
+            flush()
+            written += len(rows)
+    return written
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Crawl every NPI Registry provider matching search attributes.")
+    parser.add_argument("--taxonomy", help="Taxonomy description, e.g. 'Family Medicine'")
+    parser.add_argument("--state", help="Two-letter state code")
+    parser.add_argument("--city", help="City name")
+    parser.add_argument("--postal-code", help="5-digit ZIP, or a prefix with a trailing * (at least 2 digits)")
+    parser.add_argument("--type", choices=["NPI-1", "NPI-2"], help="Individuals (NPI-1) or organizations (NPI-2)")
+    parser.add_argument("-o", "--output", default="npi_crawl.parquet", help="Parquet file to write")
+    parser.add_argument("--workers", type=int, default=8, help="Concurrent queries")
+    parser.add_argument("--rate", type=float, default=10.0, help="Maximum requests per second")
+    args = parser.parse_args()
+
+    query = {
+        key: value for key, value in (
+            ("taxonomy_description", args.taxonomy), ("state", args.state), ("city", args.city),
+            ("postal_code", args.postal_code), ("enumeration_type", args.type),
+        ) if value
+    }
+    if not query:
+        parser.error("give at least one of --taxonomy, --state, --city, --postal-code or --type")
+
+    stats = {}
+    with NPIClient(max_workers=args.workers, rate=args.rate) as client:
+        count = write_parquet(crawl(client, query, stats), args.output)
+    print(f"{count} providers written to {args.output} "
+          f"({stats['queries']} queries, {stats['split']} split, {stats['failed']} failed, "
+          f"{stats['truncated']} truncated)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,38 @@
+#!/usr/bin/env python3
+"""
+Streaming Excel export for NPI results.
+
+Rows go through an openpyxl write-only workbook as they arrive from the fetcher, so
+memory stays flat whether 100 or 100,000 NPIs are enriched. The export always goes to
+its own file; the input roster is never opened for writing.
+
+write_records_xlsx() writes NPIRecords with the npi_xclpull.py column layout. The
+header has to be written before the first row, so the number of taxonomy pairs is
+passed in: npi_xclpull.py takes it from a first pass over its checkpoint, giving the
+same columns as records_to_frame(). It defaults to MAX_TAXONOMIES (blank where a
+provider has fewer). write_rows_xlsx() writes ready-made rows, e.g. the GUI tables.
+"""
+from openpyxl import Workbook
+
+from npi_records import MAX_TAXONOMIES, frame_header, record_row
+
+
+def write_rows_xlsx(path: str, header, rows, sheet_name: str = "NPI_Results") -> int:
+    """Stream a header and rows into a new single-sheet workbook. Returns the number of rows."""
+    wb = Workbook(write_only=True)
+    ws = wb.create_sheet(title=sheet_name)
+    ws.append(list(header))
+    count = 0
+    for row in rows:
+        # Blank cells are left out entirely, which is several times faster than writing ''
+        ws.append([None if value == "" else value for value in row])
+        count += 1
+    wb.save(path)
+    return count
+
+
+def write_records_xlsx(path: str, records, sheet_name: str = "NPI_Results",
+                       taxonomy_width: int = MAX_TAXONOMIES) -> int:
+    """Stream NPIRecords (any iterable, e.g. a generator over lookups) into a new workbook."""
+    rows = (record_row(record, taxonomy_width) for record in records)
+    return write_rows_xlsx(path, frame_header(taxonomy_width), rows, sheet_name)
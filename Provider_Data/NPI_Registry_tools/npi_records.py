@@ -0,0 +1,160 @@
+#!/usr/bin/env python3
+"""
+One normalizer for NPI Registry results, shared by npi_xclpull.py, app_npisearch.py
+and Healthcare/NPIsearch.py.
+
+normalize() turns a registry result dict (as returned by NPIClient.lookup or
+NPPESIndex.lookup) into a compact NPIRecord. Missing values are always '' and a
+result of None becomes a "Not Found" record, so every tool starts from the same data.
+Taxonomies are kept as codes; nucc_taxonomy.describe() supplies descriptions on demand.
+records_to_frame() converts a batch of records to a pandas DataFrame in one go;
+frame_header() and record_row() give the same layout one row at a time for streaming.
+"""
+from typing import NamedTuple
+
+from nucc_taxonomy import describe, learn
+
+NOT_FOUND = "Not Found"
+
+# Output column names used by the Excel exports, in order (taxonomy columns follow)
+FRAME_COLUMNS = [
+    "NPI", "NPI Type", "Last Name", "First Name", "Organization Name",
+    "Doing Business As", "Gender", "Address", "City", "State", "Zip Code", "Phone", "Fax",
+]
+# The registry lists at most 15 taxonomies per provider
+MAX_TAXONOMIES = 15
+
+
+class NPIRecord(NamedTuple):
+    npi: str
+    npi_type: str
+    last_name: str
+    first_name: str
+    organization_name: str
+    dba_name: str
+    sex: str
+    address: str
+    city: str
+    state: str
+    postal_code: str
+    phone: str
+    fax: str
+    # ((code, primary), ...) with primary taxonomies first
+    taxonomies: tuple
+
+    @property
+    def found(self) -> bool:
+        return self.npi_type != NOT_FOUND
+
+    @property
+    def display_name(self) -> str:
+        """'Last, First' for individuals, the organization name otherwise."""
+        if self.npi_type == "NPI-2":
+            return self.organization_name
+        return f"{self.last_name}, {self.first_name}".strip(", ")
+
+    @property
+    def zip5(self) -> str:
+        return self.postal_code[:5] if self.postal_code.isdigit() else self.postal_code.split("-")[0]
+
+    @property
+    def primary_taxonomies(self) -> tuple:
+        return tuple(t for t in self.taxonomies if t[1])
+
+    @property
+    def other_taxonomies(self) -> tuple:
+        return tuple(t for t in self.taxonomies if not t[1])
+
+
+def _dba_name(result: dict) -> str:
+    """Doing-business-as name: a DBA-typed other name first, then any other organization name."""
+    other_names = result.get("other_names") or []
+    for other in other_names:
+        if other.get("code") == "3" and other.get("organization_name"):
+            return other["organization_name"]
+    for other in other_names:
+        if other.get("organization_name"):
+            return other["organization_name"]
+    return result.get("basic", {}).get("dba_name", "") or ""
+
+
+def _primary_address(result: dict) -> dict:
+    """The practice location address when labelled, otherwise the first address."""
+    addresses = result.get("addresses") or [{}]
+    for address in addresses:
+        if address.get("address_purpose") == "LOCATION":
+            return address
+    return addresses[0]
+
+
+def normalize(npi, result: dict) -> NPIRecord:
+    """Build an NPIRecord from one registry result (None means the registry had no match)."""
+    npi = str(npi).strip()
+    if not result:
+        return NPIRecord(npi, NOT_FOUND, "", "", "", "", "", "", "", "", "", "", "", ())
+
+    basic = result.get("basic", {})
+    address = _primary_address(result)
+    taxonomies = result.get("taxonomies") or []
+    ordered = [t for t in taxonomies if t.get("primary")] + [t for t in taxonomies if not t.get("primary")]
+    npi_type = result.get("enumeration_type", "")
+    for t in ordered:
+        learn(t.get("code", ""), t.get("desc", ""))
+    is_org = npi_type == "NPI-2"
+
+    return NPIRecord(
+        npi=npi,
+        npi_type=npi_type,
+        last_name="" if is_org else basic.get("last_name", ""),
+        first_name="" if is_org else basic.get("first_name", ""),
+        organization_name=basic.get("organization_name", "") if is_org else "",
+        dba_name=_dba_name(result),
+        # The registry has used both keys for the same field
+        sex="" if is_org else basic.get("sex") or basic.get("gender") or "",
+        address=address.get("address_1", ""),
+        city=address.get("city", ""),
+        state=address.get("state", ""),
+        postal_code=address.get("postal_code", ""),
+        phone=address.get("telephone_number", ""),
+        fax=address.get("fax_number", ""),
+        taxonomies=tuple((t.get("code", ""), bool(t.get("primary"))) for t in ordered),
+    )
+
+
+def frame_header(width: int) -> list:
+    """FRAME_COLUMNS followed by `width` interleaved Taxonomy{n} / Taxonomy Description{n} columns."""
+    header = list(FRAME_COLUMNS)
+    for i in range(width):
+        header += [f"Taxonomy{i + 1}", f"Taxonomy Description{i + 1}"]
+    return header
+
+
+def record_row(record: NPIRecord, width: int) -> list:
+    """One output row for frame_header(width); taxonomies beyond `width` are dropped."""
+    row = list(record[:-1])
+    for i in range(width):
+        code = record.taxonomies[i][0] if i < len(record.taxonomies) else ""
+        row += [code, describe(code) if code else ""]
+    return row
+
+
+def records_to_frame(records, width: int = None):
+    """
+    Convert NPIRecords to a DataFrame with FRAME_COLUMNS followed by interleaved
+    Taxonomy{n} / Taxonomy Description{n} columns (primary taxonomy first), `width`
+    pairs of them (default: as many as the widest record needs).
+    Taxonomy columns are categoricals, and each description is looked up once per code.
+    """
+    import pandas as pd
+
+    records = list(records)
+    if width is None:
+        width = max((len(r.taxonomies) for r in records), default=0)
+    df = pd.DataFrame.from_records([r[:-1] for r in records], columns=FRAME_COLUMNS)
+    for i in range(width):
+        codes = pd.Categorical([r.taxonomies[i][0] if i < len(r.taxonomies) else "" for r in records])
+        df[f"Taxonomy{i + 1}"] = codes
+        df[f"Taxonomy Description{i + 1}"] = pd.Categorical(
+            codes.map({code: describe(code) if code else "" for code in codes.categories})
+        )
+    return df
@@ -0,0 +1,94 @@
+#!/usr/bin/env python3
+"""
+Client-side NPI validation, run before any request goes out.
+
+validate_npis() cleans a whole list at once with pandas/numpy:
+- strips whitespace and Excel float suffixes (1234567893.0 -> 1234567893),
+- zero-pads numeric cells that lost leading zeros,
+- rejects anything that is not exactly 10 digits,
+- checks the Luhn check digit over the 80840 health-industry prefix,
+- drops duplicates, keeping the first occurrence.
+Invalid entries are returned separately with the reason, so dirty rosters cost no
+wasted registry round trips.
+
+Usage:
+    python npi_validate.py roster.xlsx [--column A] [--sheet NAME]
+"""
+import argparse
+
+import numpy as np
+import pandas as pd
+
+# Luhn sum contributed by the "80840" prefix (its 4 and middle 0 are doubled)
+PREFIX_SUM = 24
+
+
+def luhn_valid(npis: np.ndarray) -> np.ndarray:
+    """Boolean mask of 10-digit NPI strings whose check digit is correct."""
+    if not len(npis):
+        return np.zeros(0, dtype=bool)
+    digits = (np.frombuffer("".join(npis).encode("ascii"), dtype=np.uint8) - ord("0")).reshape(-1, 10).astype(np.int64)
+    # Counting from the right of the first 9 digits, every other digit is doubled
+    doubled = digits[:, 0:9:2] * 2
+    doubled -= 9 * (doubled > 9)
+    total = PREFIX_SUM + doubled.sum(axis=1) + digits[:, 1:9:2].sum(axis=1)
+    return (10 - total % 10) % 10 == digits[:, 9]
+
+
+def clean_npis(values) -> pd.Series:
+    """Normalized text for each value: whitespace and float suffixes removed, numbers zero-padded."""
+    raw = pd.Series(list(values), dtype=object)
+    text = raw.map(lambda v: "" if v is None or (isinstance(v, float) and np.isnan(v)) else str(v))
+    text = text.str.replace(r"\s+", "", regex=True).str.replace(r"\.0+$", "", regex=True)
+    numeric = raw.map(lambda v: isinstance(v, (int, float, np.integer, np.floating)) and not isinstance(v, bool))
+    numeric &= text.ne("")
+    text[numeric] = text[numeric].str.zfill(10)
+    return text
+
+
+def validate_npis(values):
+    """
+    Returns (valid, invalid): valid is the list of unique valid NPIs in input order;
+    invalid is a list of (position, original value, reason) with 0-based positions.
+    """
+    values = list(values)
+    text = clean_npis(values)
+    blank = text.eq("").to_numpy()
+    # [0-9], not \d: other Unicode digits would pass and then break the ASCII Luhn check
+    ten_digits = text.str.fullmatch(r"[0-9]{10}").to_numpy(dtype=bool)
+    checksum = np.zeros(len(text), dtype=bool)
+    checksum[ten_digits] = luhn_valid(text[ten_digits].to_numpy(dtype=str))
+
+    reasons = np.where(blank, "blank", np.where(~ten_digits, "not 10 digits", "bad check digit"))
+    invalid = [(int(i), values[i], str(reasons[i])) for i in np.flatnonzero(~checksum)]
+    valid = text[checksum].drop_duplicates().tolist()
+    return valid, invalid
+
+
+def format_invalid(invalid, limit: int = 20) -> str:
+    """One line per invalid entry (up to `limit` of them), for printing or a message box."""
+    lines = [f"Entry {position + 1} {value!r}: {reason}" for position, value, reason in invalid[:limit]]
+    if len(invalid) > limit:
+        lines.append(f"...and {len(invalid) - limit} more")
+    return "\n".join(lines)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Check a column of NPIs without calling the registry.")
+    parser.add_argument("file_path", help="Excel workbook holding the NPIs")
+    parser.add_argument("--column", default="A", help="Column letter with the NPIs (default: A)")
+    parser.add_argument("--sheet", help="Sheet name (default: the active sheet)")
+    args = parser.parse_args()
+
+    from npi_cache import read_npi_column
+
+    values = read_npi_column(args.file_path, args.column, args.sheet)
+    valid, invalid = validate_npis(values)
+    print(f"{len(values)} entries: {len(valid)} unique valid NPIs, {len(invalid)} invalid, "
+          f"{len(values) - len(invalid) - len(valid)} duplicates")
+    if invalid:
+        print(format_invalid(invalid, limit=50))
+
+
+if __name__ == "__main__":
+    main()
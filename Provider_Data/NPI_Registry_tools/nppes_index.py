@@ -0,0 +1,231 @@
+#!/usr/bin/env python3
+"""
+Offline NPI lookups from the CMS NPPES dissemination file.
+
+The importer streams the multi-GB npidata_pfile CSV once into a compact SQLite index
+(NPI as the integer primary key, one small JSON document per provider). Lookups then
+return the same result shape as the live registry API, so npi_xclpull.py and the other
+tools build identical rows without any network calls. Deactivated NPIs (no entity type)
+are skipped, as the registry does. The dissemination file carries taxonomy codes only,
+so taxonomy descriptions are left out.
+
+Usage:
+    python nppes_index.py import npidata_pfile_20050523-20250907.csv [-o nppes_index.sqlite]
+    python nppes_index.py lookup 1234567893 [-i nppes_index.sqlite]
+
+npi_xclpull.py uses the index instead of the API when NPPES_INDEX_PATH is set.
+"""
+import argparse
+import csv
+import json
+import os
+import sqlite3
+import sys
+
+INDEX_PATH = os.getenv("NPPES_INDEX_PATH", "nppes_index.sqlite")
+BATCH_SIZE = 10_000
+MAX_TAXONOMIES = 15
+
+# NPPES column names (the sex column was renamed from "Gender" in later files)
+COL_NPI = "NPI"
+COL_ENTITY = "Entity Type Code"
+COL_ORG = "Provider Organization Name (Legal Business Name)"
+COL_LAST = "Provider Last Name (Legal Name)"
+COL_FIRST = "Provider First Name"
+COL_MIDDLE = "Provider Middle Name"
+COL_CREDENTIAL = "Provider Credential Text"
+COL_SEX = ("Provider Sex Code", "Provider Gender Code")
+COL_OTHER_ORG = "Provider Other Organization Name"
+ADDRESS_COLUMNS = {
+    "LOCATION": {
+        "address_1": "Provider First Line Business Practice Location Address",
+        "address_2": "Provider Second Line Business Practice Location Address",
+        "city": "Provider Business Practice Location Address City Name",
+        "state": "Provider Business Practice Location Address State Name",
+        "postal_code": "Provider Business Practice Location Address Postal Code",
+        "telephone_number": "Provider Business Practice Location Address Telephone Number",
+        "fax_number": "Provider Business Practice Location Address Fax Number",
+    },
+    "MAILING": {
+        "address_1": "Provider First Line Business Mailing Address",
+        "address_2": "Provider Second Line Business Mailing Address",
+        "city": "Provider Business Mailing Address City Name",
+        "state": "Provider Business Mailing Address State Name",
+        "postal_code": "Provider Business Mailing Address Postal Code",
+        "telephone_number": "Provider Business Mailing Address Telephone Number",
+        "fax_number": "Provider Business Mailing Address Fax Number",
+    },
+}
+
+
+def _phone(value: str) -> str:
+    """Format a 10-digit NPPES phone number the way the registry API does (555-123-4567)."""
+    if len(value) == 10 and value.isdigit():
+        return f"{value[:3]}-{value[3:6]}-{value[6:]}"
+    return value
+
+
+class _RowMapper:
+    """Turns one NPPES CSV row into a registry-API-shaped result dict, using header positions."""
+
+    def __init__(self, header: list):
+        pos = {name: i for i, name in enumerate(header)}
+        self.npi = pos[COL_NPI]
+        self.entity = pos[COL_ENTITY]
+        self.basic = [
+            (key, pos[col]) for key, col in (
+                ("organization_name", COL_ORG), ("last_name", COL_LAST), ("first_name", COL_FIRST),
+                ("middle_name", COL_MIDDLE), ("credential", COL_CREDENTIAL),
+            ) if col in pos
+        ]
+        sex_col = next((col for col in COL_SEX if col in pos), None)
+        if sex_col:
+            self.basic.append(("sex", pos[sex_col]))
+        self.other_org = pos.get(COL_OTHER_ORG)
+        self.addresses = [
+            (purpose, [(key, pos[col]) for key, col in cols.items() if col in pos])
+            for purpose, cols in ADDRESS_COLUMNS.items()
+        ]
+        self.taxonomies = []
+        for n in range(1, MAX_TAXONOMIES + 1):
+            code = pos.get(f"Healthcare Provider Taxonomy Code_{n}")
+            if code is None:
+                break
+            self.taxonomies.append((
+                code,
+                pos.get(f"Healthcare Provider Primary Taxonomy Switch_{n}"),
+                pos.get(f"Provider License Number_{n}"),
+                pos.get(f"Provider License Number State Code_{n}"),
+            ))
+
+    def __call__(self, row: list):
+        entity = row[self.entity]
+        if not entity:
+            return None  # deactivated NPI
+        npi = row[self.npi]
+        result = {
+            "number": npi,
+            "enumeration_type": "NPI-1" if entity == "1" else "NPI-2",
+            "basic": {key: row[i] for key, i in self.basic if row[i]},
+            "addresses": [],
+            "taxonomies": [],
+        }
+        if self.other_org is not None and row[self.other_org]:
+            result["other_names"] = [{"organization_name": row[self.other_org]}]
+        for purpose, cols in self.addresses:
+            address = {"address_purpose": purpose}
+            for key, i in cols:
+                if row[i]:
+                    address[key] = _phone(row[i]) if key in ("telephone_number", "fax_number") else row[i]
+            if len(address) > 1:
+                result["addresses"].append(address)
+        for code_i, switch_i, license_i, state_i in self.taxonomies:
+            code = row[code_i]
+            if not code:
+                continue
+            taxonomy = {"code": code, "primary": switch_i is not None and row[switch_i] == "Y"}
+            if license_i is not None and row[license_i]:
+                taxonomy["license"] = row[license_i]
+            if state_i is not None and row[state_i]:
+                taxonomy["state"] = row[state_i]
+            result["taxonomies"].append(taxonomy)
+        return int(npi), result
+
+
+def build_index(csv_path: str, index_path: str = INDEX_PATH, progress_every: int = 500_000) -> int:
+    """Stream an NPPES CSV into a fresh SQLite index. Returns the number of NPIs stored."""
+    if os.path.exists(index_path):
+        os.remove(index_path)
+    conn = sqlite3.connect(index_path)
+    # Bulk load: the file is rebuilt from scratch if the import is interrupted
+    conn.execute("PRAGMA journal_mode=OFF")
+    conn.execute("PRAGMA synchronous=OFF")
+    conn.execute("CREATE TABLE providers (npi INTEGER PRIMARY KEY, body TEXT NOT NULL)")
+
+    count = 0
+    with open(csv_path, "r", encoding="utf-8", errors="replace", newline="") as f:
+        reader = csv.reader(f)
+        mapper = _RowMapper(next(reader))
+        batch = []
+        for row in reader:
+            mapped = mapper(row)
+            if mapped is None:
+                continue
+            npi, result = mapped
+            batch.append((npi, json.dumps(result, separators=(",", ":"))))
+            if len(batch) >= BATCH_SIZE:
+                conn.executemany("INSERT OR REPLACE INTO providers VALUES (?, ?)", batch)
+                count += len(batch)
+                batch.clear()
+                if progress_every and count % progress_every < BATCH_SIZE:
+                    print(f"  {count:,} NPIs indexed...")
+        if batch:
+            conn.executemany("INSERT OR REPLACE INTO providers VALUES (?, ?)", batch)
+            count += len(batch)
+    conn.commit()
+    conn.close()
+    return count
+
+
+class NPPESIndex:
+    """Local lookup backend with the same lookup/lookup_many interface as NPIClient."""
+
+    def __init__(self, index_path: str = INDEX_PATH):
+        if not os.path.exists(index_path):
+            raise FileNotFoundError(f"NPPES index not found: {index_path} (build it with 'nppes_index.py import')")
+        self._conn = sqlite3.connect(f"file:{index_path}?mode=ro", uri=True, check_same_thread=False)
+
+    def close(self):
+        self._conn.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def lookup(self, npi) -> dict:
+        """Return the registry-shaped result for an NPI, or None if it is not in the file."""
+        key = str(npi).strip()
+        if not key.isdigit():
+            return None
+        row = self._conn.execute("SELECT body FROM providers WHERE npi = ?", (int(key),)).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def lookup_many(self, npis, ordered: bool = True):
+        """Yields (npi, result, error) like NPIClient.lookup_many; local lookups are already in order."""
+        for npi in npis:
+            try:
+                yield npi, self.lookup(npi), None
+            except Exception as e:
+                yield npi, None, e
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Build and query an offline NPPES index.")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    import_parser = sub.add_parser("import", help="Stream an NPPES dissemination CSV into the index")
+    import_parser.add_argument("csv_path", help="npidata_pfile_*.csv from the NPPES download")
+    import_parser.add_argument("-o", "--index", default=INDEX_PATH, help="Index file to create")
+
+    lookup_parser = sub.add_parser("lookup", help="Print the stored record for one or more NPIs")
+    lookup_parser.add_argument("npis", nargs="+")
+    lookup_parser.add_argument("-i", "--index", default=INDEX_PATH, help="Index file to read")
+
+    args = parser.parse_args()
+    if args.command == "import":
+        count = build_index(args.csv_path, args.index)
+        print(f"Indexed {count:,} NPIs into {args.index}")
+    else:
+        with NPPESIndex(args.index) as index:
+            for npi in args.npis:
+                result = index.lookup(npi)
+                if result is None:
+                    print(f"{npi}: not found", file=sys.stderr)
+                else:
+                    print(json.dumps(result, indent=2))
+
+
+if __name__ == "__main__":
+    main()
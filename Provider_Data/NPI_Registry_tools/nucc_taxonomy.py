@@ -0,0 +1,178 @@
+#!/usr/bin/env python3
+"""
+NUCC Health Care Provider Taxonomy dictionary.
+
+The NUCC code set (nucc_taxonomy.csv next to this file, or NUCC_TAXONOMY_PATH) is
+loaded on first use into an in-memory dict of code -> Taxonomy (grouping,
+classification, specialization). NPIRecords only carry taxonomy codes, and
+describe() turns a code back into the registry-style description on demand.
+Codes missing from the table fall back to the description the registry sent the
+first time the code was seen. The CSV is not shipped with the tools (fetch it once with
+'download'); until it is there, table() warns once and add_taxonomy_columns() raises,
+rather than quietly producing blank descriptions and groupings.
+
+add_taxonomy_columns() adds categorical Grouping / Classification / Specialization
+columns for a code column, so rosters can be grouped and filtered in pandas without
+string matching on descriptions.
+
+Usage:
+    python nucc_taxonomy.py download [--version 250]    # fetch the CSV from nucc.org
+    python nucc_taxonomy.py show 207Q00000X 208D00000X
+"""
+import argparse
+import csv
+import io
+import os
+import threading
+import warnings
+from pathlib import Path
+from typing import NamedTuple
+
+TAXONOMY_PATH = os.getenv("NUCC_TAXONOMY_PATH", str(Path(__file__).with_name("nucc_taxonomy.csv")))
+DOWNLOAD_URL = "https://www.nucc.org/images/stories/CSV/nucc_taxonomy_{version}.csv"
+DEFAULT_VERSION = "250"
+
+
+class Taxonomy(NamedTuple):
+    code: str
+    grouping: str
+    classification: str
+    specialization: str
+    display_name: str
+
+    @property
+    def description(self) -> str:
+        """'Classification, Specialization', the form the NPI Registry uses."""
+        if self.specialization:
+            return f"{self.classification}, {self.specialization}"
+        return self.classification
+
+
+_table = None
+_load_lock = threading.Lock()
+# Registry descriptions for codes missing from the NUCC table, one string per code
+_learned = {}
+
+
+def load_table(path: str = TAXONOMY_PATH) -> dict:
+    """Read the NUCC CSV into {code: Taxonomy}. Returns {} when the file is missing."""
+    if not os.path.exists(path):
+        return {}
+    raw = Path(path).read_bytes()
+    try:
+        text = raw.decode("utf-8-sig")
+    except UnicodeDecodeError:
+        text = raw.decode("cp1252", errors="replace")  # older NUCC releases
+    table = {}
+    for row in csv.DictReader(io.StringIO(text, newline="")):
+        code = (row.get("Code") or "").strip()
+        if code:
+            table[code] = Taxonomy(
+                code,
+                (row.get("Grouping") or "").strip(),
+                (row.get("Classification") or "").strip(),
+                (row.get("Specialization") or "").strip(),
+                (row.get("Display Name") or "").strip(),
+            )
+    return table
+
+
+def missing_table_message() -> str:
+    return (f"NUCC taxonomy table not found at {TAXONOMY_PATH}. Run 'python nucc_taxonomy.py download' "
+            f"(or set NUCC_TAXONOMY_PATH). Until then taxonomy descriptions are only available when "
+            f"the registry sends them, and groupings are unavailable.")
+
+
+def table_missing() -> bool:
+    """True if the NUCC CSV is absent (or empty), e.g. so a GUI can tell the user."""
+    return not table()
+
+
+def table() -> dict:
+    """The NUCC table, loaded once on first use. Warns once if the CSV is missing."""
+    global _table
+    if _table is None:
+        with _load_lock:
+            if _table is None:
+                _table = load_table()
+                if not _table:
+                    warnings.warn(missing_table_message(), stacklevel=3)
+    return _table
+
+
+def lookup(code: str):
+    """Taxonomy for a code, or None if it is not in the NUCC table."""
+    return table().get(code)
+
+
+def learn(code: str, desc: str):
+    """Remember the registry's description for a code the NUCC table does not have."""
+    if code and desc and code not in _learned and code not in table():
+        _learned[code] = desc
+
+
+def describe(code: str) -> str:
+    """Registry-style description for a code ('' if unknown)."""
+    taxonomy = table().get(code)
+    if taxonomy is not None:
+        return taxonomy.description
+    return _learned.get(code, "")
+
+
+def add_taxonomy_columns(df, code_column: str = "Taxonomy1", prefix: str = None):
+    """
+    Add categorical Grouping / Classification / Specialization columns for `code_column`.
+    Each distinct code is looked up once; unknown codes get blanks.
+    Raises FileNotFoundError if the NUCC table has not been downloaded.
+    """
+    import pandas as pd
+
+    known = table()
+    if not known:
+        raise FileNotFoundError(missing_table_message())
+    prefix = prefix if prefix is not None else f"{code_column} "
+    codes = df[code_column].astype("category")
+    for field in ("grouping", "classification", "specialization"):
+        values = {code: getattr(known[code], field) if code in known else "" for code in codes.cat.categories}
+        df[f"{prefix}{field.title()}"] = pd.Categorical(codes.map(values).astype(object).fillna(""))
+    return df
+
+
+def download(version: str = DEFAULT_VERSION, path: str = TAXONOMY_PATH) -> int:
+    """Fetch a NUCC release CSV into `path`. Returns the number of codes in it."""
+    import requests
+
+    response = requests.get(DOWNLOAD_URL.format(version=version), timeout=60)
+    response.raise_for_status()
+    with open(path, "wb") as f:
+        f.write(response.content)
+    return len(load_table(path))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="NUCC provider taxonomy dictionary.")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    download_parser = sub.add_parser("download", help="Fetch the NUCC taxonomy CSV from nucc.org")
+    download_parser.add_argument("--version", default=DEFAULT_VERSION, help="NUCC release, e.g. 250 for 25.0")
+
+    show_parser = sub.add_parser("show", help="Print the classification of one or more codes")
+    show_parser.add_argument("codes", nargs="+")
+
+    args = parser.parse_args()
+    if args.command == "download":
+        count = download(args.version)
+        print(f"Saved {count} taxonomy codes to {TAXONOMY_PATH}")
+    else:
+        if table_missing():
+            print(missing_table_message())
+        for code in args.codes:
+            taxonomy = lookup(code)
+            if taxonomy is None:
+                print(f"{code}: unknown")
+            else:
+                print(f"{code}: {taxonomy.grouping} / {taxonomy.description}")
+
+
+if __name__ == "__main__":
+    main()
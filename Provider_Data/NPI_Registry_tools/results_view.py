@@ -0,0 +1,145 @@
+#!/usr/bin/env python3
+"""
+Results model and virtualized Treeview for app_npisearch.py.
+
+ResultsModel keeps every fetched row in one plain list. The Treeview and the tksheet
+both read from it instead of from each other, and new rows arrive in batches.
+
+VirtualTreeview only creates Treeview items for the rows that fit on screen and
+re-fills them as the user scrolls (scrollbar, mouse wheel, arrow and page keys).
+A refresh costs the same with 50 rows loaded or 50,000.
+"""
+from tkinter import ttk
+
+
+class ResultsModel:
+    """Table rows (lists of values), appended a batch at a time."""
+
+    def __init__(self):
+        self.rows = []
+
+    def __len__(self):
+        return len(self.rows)
+
+    def __getitem__(self, index):
+        return self.rows[index]
+
+    def extend(self, rows):
+        self.rows.extend(rows)
+
+    def clear(self):
+        self.rows = []
+
+
+class VirtualTreeview:
+    """Shows a window of a ResultsModel in a Treeview, with its own vertical scrollbar."""
+
+    def __init__(self, tree: ttk.Treeview, model: ResultsModel, scrollbar: ttk.Scrollbar):
+        self.tree = tree
+        self.model = model
+        self.scrollbar = scrollbar
+        self.first = 0                       # model index of the top visible row
+        self.visible = int(tree.cget("height"))
+        self._items = []                     # item ids on screen, top to bottom
+        self._selected = None                # model index of the selection, even when scrolled away
+
+        scrollbar.config(command=self.yview)
+        tree.bind("<Configure>", self._on_resize)
+        tree.bind("<MouseWheel>", self._on_wheel)
+        tree.bind("<Button-4>", lambda event: self._scroll(-3))  # X11 wheel
+        tree.bind("<Button-5>", lambda event: self._scroll(3))
+        tree.bind("<Up>", lambda event: self._on_arrow(-1))
+        tree.bind("<Down>", lambda event: self._on_arrow(1))
+        tree.bind("<Prior>", lambda event: self._scroll(-self.visible))
+        tree.bind("<Next>", lambda event: self._scroll(self.visible))
+
+    def selected_index(self):
+        """Model index of the selected row, or None."""
+        selection = self.tree.selection()
+        if selection and selection[0] in self._items:
+            return self.first + self._items.index(selection[0])
+        return None
+
+    def reset(self):
+        """Forget the scroll position and selection (after the model is cleared)."""
+        self.first = 0
+        self._selected = None
+        self.refresh()
+
+    def refresh(self):
+        """Re-fill the visible rows from the model, e.g. after a batch was appended."""
+        self._show(self.first)
+
+    def yview(self, *args):
+        """Scrollbar callback: ('moveto', fraction) or ('scroll', n, 'units'|'pages')."""
+        if args[0] == "moveto":
+            self._show(int(float(args[1]) * len(self.model)))
+        elif args[0] == "scroll":
+            step = int(args[1]) * (self.visible if args[2] == "pages" else 1)
+            self._show(self.first + step)
+
+    def _on_screen(self, index) -> bool:
+        return index is not None and self.first <= index < self.first + len(self._items)
+
+    def _show(self, first: int, select: int = None):
+        # Remember the selection before the items are re-filled with other rows
+        current = self.selected_index()
+        if select is not None:
+            self._selected = select
+        elif current is not None or self._on_screen(self._selected):
+            self._selected = current
+
+        total = len(self.model)
+        self.first = max(0, min(first, total - self.visible))
+        window = self.model.rows[self.first:self.first + self.visible]
+
+        while len(self._items) > len(window):
+            self.tree.delete(self._items.pop())
+        while len(self._items) < len(window):
+            self._items.append(self.tree.insert("", "end"))
+        for iid, values in zip(self._items, window):
+            self.tree.item(iid, values=values)
+
+        if self._on_screen(self._selected):
+            iid = self._items[self._selected - self.first]
+            if self.tree.selection() != (iid,):
+                self.tree.selection_set(iid)
+            self.tree.focus(iid)
+        elif self.tree.selection():
+            self.tree.selection_set(())
+
+        if total:
+            self.scrollbar.set(self.first / total, min(1.0, (self.first + self.visible) / total))
+        else:
+            self.scrollbar.set(0.0, 1.0)
+
+    def _scroll(self, rows: int):
+        self._show(self.first + rows)
+        return "break"
+
+    def _on_wheel(self, event):
+        return self._scroll(-3 if event.delta > 0 else 3)
+
+    def _on_arrow(self, step: int):
+        """Let the Treeview move inside the window; scroll when the selection would leave it."""
+        index = self.selected_index()
+        if index is None:
+            return None
+        target = max(0, min(index + step, len(self.model) - 1))
+        if self.first <= target < self.first + len(self._items):
+            return None
+        top = target if step < 0 else target - self.visible + 1
+        self._show(top, select=target)
+        return "break"
+
+    def _on_resize(self, event):
+        """Show as many rows as fit in the new height."""
+        bbox = self.tree.bbox(self._items[0]) if self._items else None
+        if bbox:
+            heading, row_height = bbox[1], bbox[3]
+        else:
+            heading, row_height = 25, 20
+        visible = max(1, (event.height - heading) // row_height)
+        if visible != self.visible:
+            self.visible = visible
+            self.refresh()